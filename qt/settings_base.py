@@ -136,7 +136,7 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "qt_security.authentication.EntitlementJWTAuthentication",
     ),
     # https://www.django-rest-framework.org/api-guide/pagination/#cursorpagination
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.CursorPagination",
@@ -155,6 +155,23 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Add the account status & subscription to access tokens,
+# so requests can be authorized without loading the user.
+JWT_ENTITLEMENT_CLAIMS = os.environ.get("JWT_ENTITLEMENT_CLAIMS", "False") == "True"
+# Whether the user of such a token is active is cached in-process
+ACTIVE_USER_CACHE_MAX_SIZE = 10000
+ACTIVE_USER_CACHE_TTL = 10  # seconds
+
+# Revoked refresh tokens are kept in-process and, when an alias is given,
+# in that (shared) cache. Without it unknown tokens are checked in the database.
+REVOCATION_CACHE_ALIAS = os.environ.get("REVOCATION_CACHE_ALIAS")
+# The shared cache is reloaded from the database at least this often,
+# restoring revoked tokens evicted under memory pressure. Run the
+# load_revocation_list command more often than this, otherwise the cache is
+# loaded in the background once requests notice it's outdated.
+REVOCATION_RELOAD_INTERVAL = 60  # 1 minute
+REVOCATION_LOAD_WORKERS = 1
+
 WWW_URL = os.environ.get("WWW_URL", "http://localhost:3000")
 API_URL = os.environ.get("API_URL", "http://localhost:8000")
 
@@ -166,6 +183,42 @@ STRIPE_SUBSCRIPTION_ITEM_ID = "sub_1NTMBNHPjqvUQHRQummpAYuH"
 DJSTRIPE_WEBHOOK_SECRET = os.environ.get("DJSTRIPE_WEBHOOK_SECRET")
 DJSTRIPE_USE_NATIVE_JSONFIELD = True
 DJSTRIPE_FOREIGN_KEY_TO_FIELD = "id"
+STRIPE_HTTP_TIMEOUT = 30  # seconds
+STRIPE_MAX_NETWORK_RETRIES = 2
+# The subscription status per customer is cached (and updated by the webhooks)
+# in this cache, which must be shared between all workers (e.g. Redis).
+# Without it only valid statuses are cached in-process, for a few seconds.
+SUBSCRIPTION_CACHE_ALIAS = os.environ.get("SUBSCRIPTION_CACHE_ALIAS")
+SUBSCRIPTION_CACHE_TTL = 60 * 60  # 1 hour
+SUBSCRIPTION_LOCAL_CACHE_MAX_SIZE = 10000
+SUBSCRIPTION_LOCAL_CACHE_TTL = 30  # seconds
+# Open Checkout sessions are reused per customer, price and parameters in this
+# cache, which must be shared between all workers (e.g. Redis) as the webhooks
+# drop completed sessions. Without it sessions are not reused.
+CHECKOUT_SESSION_CACHE_ALIAS = os.environ.get("CHECKOUT_SESSION_CACHE_ALIAS")
+CHECKOUT_SESSION_EXPIRY = 60 * 60  # 1 hour, Stripe requires at least 30 minutes
+CHECKOUT_SESSION_REUSE_MARGIN = 60 * 15  # 15 minutes
+CHECKOUT_SESSION_IDEMPOTENCY_WINDOW = 60  # 1 minute
+# Billing portal URLs are reused per customer while they are valid in this cache,
+# which must be shared between all workers (e.g. Redis) to spare repeat visits
+# the Stripe round trip. Without it sessions are not reused.
+BILLING_PORTAL_CACHE_ALIAS = os.environ.get("BILLING_PORTAL_CACHE_ALIAS")
+BILLING_PORTAL_CACHE_TTL = 60 * 4  # 4 minutes
+BILLING_PORTAL_URL_VALIDITY = 60 * 5  # 5 minutes
+# The serialized product catalog is kept in-process,
+# a shared cache spreads invalidations to all processes.
+PRODUCT_CATALOG_CACHE_ALIAS = os.environ.get("PRODUCT_CATALOG_CACHE_ALIAS")
+PRODUCT_CATALOG_TTL = 60 * 5  # 5 minutes
+# Currencies prices are shown in, when not requested or known for the customer
+# the currency is based on the language.
+SUPPORTED_CURRENCIES = ["usd", "eur"]
+DEFAULT_CURRENCY = "usd"
+LANGUAGE_CURRENCIES = {"nl": "eur"}
+# The currency of the customer of a user is cached in-process and,
+# when an alias is given, in that (shared) cache.
+CUSTOMER_CURRENCY_CACHE_ALIAS = os.environ.get("CUSTOMER_CURRENCY_CACHE_ALIAS")
+CUSTOMER_CURRENCY_CACHE_MAX_SIZE = 10000
+CUSTOMER_CURRENCY_CACHE_TTL = 60 * 5  # 5 minutes
 
 
 # AWS Config
@@ -176,6 +229,23 @@ AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
 AWS_S3_PUBLIC_ASSETS = os.environ.get("AWS_S3_PUBLIC_ASSETS")
 AWS_S3_PRIVATE_ASSETS = os.environ.get("AWS_S3_PRIVATE_ASSETS")
 
+# Presigned URLs of private assets, cached until they are valid for less
+# than the minimum validity.
+PRESIGNED_URL_EXPIRE = 60 * 60  # 1 hour
+PRESIGNED_URL_MIN_VALIDITY = 60 * 30  # 30 minutes
+PRESIGNED_URL_CACHE_ALIAS = os.environ.get("PRESIGNED_URL_CACHE_ALIAS")
+PRESIGNED_URL_CACHE_MAX_SIZE = 10000
+PRESIGNED_URL_CACHE_TTL = PRESIGNED_URL_EXPIRE - PRESIGNED_URL_MIN_VALIDITY
+
+# Threads deleting the S3 objects of deleted users
+S3_DELETE_WORKERS = 2
+
+# Shared by all users without an uploaded profile image, without an URL
+# the key in the public assets bucket is used.
+DEFAULT_PROFILE_IMAGE_URL = os.environ.get("DEFAULT_PROFILE_IMAGE_URL")
+# The name of the existing object, typo included
+DEFAULT_PROFILE_IMAGE_KEY = "images/unkown_user.png"
+
 AWS_S3_ACCESS_KEY_ID = os.environ.get("AWS_S3_ACCESS_KEY_ID")
 AWS_S3_SECRET_ACCESS_KEY = os.environ.get("AWS_S3_SECRET_ACCESS_KEY")
 
@@ -187,8 +257,53 @@ AWS_SES_REGION_ENDPOINT = os.environ.get("AWS_SES_REGION_ENDPOINT")
 
 NO_REPLY_EMAIL_ADDRESS = os.environ.get("SERVICE_EMAIL_ADDRESS")
 
-# Geolocation API
+# Email outbox, see the `send_outgoing_emails` command
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60  # seconds, doubled on every attempt
+EMAIL_OUTBOX_POLL_INTERVAL = 5  # seconds
+# Emails claimed by a worker that died are sent again after this timeout
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 60 * 10  # 10 minutes
+
+# Newsletter, see the `send_newsletter` command
+NEWSLETTER_UNSUBSCRIBE_URL = "{www_url}/newsletter/unsubscribe/{uuid}"
+NEWSLETTER_CHUNK_SIZE = 500
+NEWSLETTER_SEND_CONCURRENCY = 4
+NEWSLETTER_SEND_RATE = 14  # emails per second, the SES sending quota
+
+# Geolocation
+# Backends are tried in order, the first one that resolves the IP address wins.
+GEOLOCATION_BACKENDS = [
+    "qt_security.geolocation.GeoIPDatabaseBackend",
+    "qt_security.geolocation.IPGeolocationAPIBackend",
+]
+# Path to a MaxMind (GeoIP2 / GeoLite2 City) .mmdb file
+GEOIP_DATABASE_PATH = os.environ.get("GEOIP_DATABASE_PATH")
 GEOLOCATION_API_KEY = os.environ.get("GEOLOCATION_API_KEY")
+GEOLOCATION_API_TIMEOUT = 2  # seconds
+# Resolved locations are cached in-process and, when an alias is given,
+# in that Django cache so they're shared between all workers.
+GEOLOCATION_CACHE_ALIAS = os.environ.get("GEOLOCATION_CACHE_ALIAS")
+GEOLOCATION_CACHE_MAX_SIZE = 10000
+GEOLOCATION_CACHE_TTL = 60 * 60 * 24  # 1 day
+# When deferred, sessions are saved with a pending location which is resolved
+# by a background thread pool (and the enrich_session_locations command).
+GEOLOCATION_DEFERRED = os.environ.get("GEOLOCATION_DEFERRED", "False") == "True"
+GEOLOCATION_ENRICHMENT_WORKERS = 2
+GEOLOCATION_ENRICHMENT_BATCH_SIZE = 100
+GEOLOCATION_ENRICHMENT_RETRIES = 3
+GEOLOCATION_ENRICHMENT_BACKOFF = 0.5  # seconds, doubled on every retry
+
+
+# Device images are matched in-process, the shared cache (alias) is used to
+# let other processes know the index is outdated.
+DEVICE_IMAGE_INDEX_CACHE_ALIAS = os.environ.get("DEVICE_IMAGE_INDEX_CACHE_ALIAS")
+DEVICE_IMAGE_INDEX_TTL = 60 * 5  # 5 minutes
+DEVICE_IMAGE_INDEX_VERSION_CHECK_INTERVAL = 5  # seconds
+DEVICE_IMAGE_INDEX_MATCHES_MAX_SIZE = 1000
+# Parsed user agents (device info & image) are cached in-process
+USER_AGENT_CACHE_MAX_SIZE = 1000
+USER_AGENT_CACHE_TTL = 60 * 60  # 1 hour
 
 
 # Internationalization
@@ -236,4 +351,12 @@ PASSWORD_MIN_LENGTH = 10
 PASSWORD_MAX_LENGTH = 100
 
 MAXIMUM_FILE_SIZE = 10240000  # 10MB
+MAXIMUM_IMAGE_DIMENSION = 8192  # pixels, width or height
+MIME_SNIFF_SIZE = 4096  # bytes of the file header passed to libmagic
+
+# Square profile image variants, generated by a worker after an upload
+IMAGE_VARIANT_SIZES = [64, 128, 512]  # pixels
+IMAGE_VARIANT_DEFAULT_SIZE = 128
+IMAGE_VARIANT_QUALITY = 85
+IMAGE_VARIANT_WORKERS = 2
 SUPPORTED_MEDIA_MIMETYPES = ["image/gif", "image/jpeg", "image/png"]
@@ -33,7 +33,8 @@ STRIPE_TEST_SECRET_KEY = ""
 STRIPE_SECRET_KEY = STRIPE_TEST_SECRET_KEY
 DJSTRIPE_WEBHOOK_SECRET = ""
 
-# Geolocation API
+# Geolocation
+GEOIP_DATABASE_PATH = ""
 GEOLOCATION_API_KEY = ""
 
 WWW_URL = "localhost:8000"
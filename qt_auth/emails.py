@@ -0,0 +1,13 @@
+from django.utils.translation import gettext_lazy as _
+
+from qt_utils.emails import EmailComposer
+
+verify_email = EmailComposer("qt_auth/email/verify_email", _("[QT] Email verification"))
+request_verify_email = EmailComposer(
+    "qt_auth/email/request_verify_email", _("[QT] New Email verification")
+)
+password_reset = EmailComposer("qt_auth/email/password_reset", _("[QT] Password reset"))
+email_reset = EmailComposer("qt_auth/email/email_reset", _("[QT] Change email"))
+verify_email_reset = EmailComposer(
+    "qt_auth/email/verify_email_reset", _("[QT] Change email verification")
+)
@@ -1,9 +1,9 @@
-import stripe
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from factory import Faker
 from factory.django import DjangoModelFactory
 
+from qt_utils.clients import get_stripe
 from qt_utils.model_loaders import (
     get_stripe_customer_model,
     get_stripe_subscription_model,
@@ -42,7 +42,7 @@ class UserUnsubscribedFactory(UserFactory):
         user = super()._create(model_class, *args, **kwargs)
 
         Customer = get_stripe_customer_model()
-        stripe_customer = stripe.Customer.retrieve(
+        stripe_customer = get_stripe().Customer.retrieve(
             settings.STRIPE_UNSUBSCRIBED_CUSTOMER_ID
         )
         djstripe_customer = Customer.sync_from_stripe_data(stripe_customer)
@@ -67,7 +67,7 @@ class UserSubscribedFactory(UserFactory):
         user = super()._create(model_class, *args, **kwargs)
 
         Customer = get_stripe_customer_model()
-        stripe_customer = stripe.Customer.retrieve(
+        stripe_customer = get_stripe().Customer.retrieve(
             settings.STRIPE_SUBSCRIBED_CUSTOMER_ID
         )
         djstripe_customer = Customer.sync_from_stripe_data(stripe_customer)
@@ -75,7 +75,7 @@ class UserSubscribedFactory(UserFactory):
         user.customer = djstripe_customer
 
         Subscription = get_stripe_subscription_model()
-        stripe_subscription = stripe.Subscription.retrieve(
+        stripe_subscription = get_stripe().Subscription.retrieve(
             settings.STRIPE_SUBSCRIPTION_ITEM_ID
         )
         Subscription.sync_from_stripe_data(stripe_subscription)
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Queue a new email verification mail for all unverified users"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument("--language", default=settings.LANGUAGE_CODE)
+
+    def handle(self, *args, **kwargs) -> None:
+        batch_size = kwargs["batch_size"]
+
+        User = get_user_model()
+        users = (
+            User.objects.filter(status=User.STATUS_TYPE_REGISTERED)
+            .only("id", "email", "first_name", "last_name")
+            .order_by("pk")
+            .iterator(chunk_size=batch_size)
+        )
+
+        queued = 0
+        started_at = time.perf_counter()
+        batch = []
+        for user in users:
+            batch.append(user)
+            if len(batch) == batch_size:
+                queued += User.send_request_email_verification_mails(
+                    batch, kwargs["language"]
+                )
+                batch = []
+        if batch:
+            queued += User.send_request_email_verification_mails(
+                batch, kwargs["language"]
+            )
+        duration = time.perf_counter() - started_at
+
+        per_message = duration / queued * 1000 if queued else 0
+        self.stdout.write(
+            f"Queued {queued} email(s) in {duration:.2f}s ({per_message:.2f}ms each)."
+        )
@@ -8,6 +8,12 @@ class CustomUserManager(BaseUserManager):
     for authentication instead of usernames.
     """
 
+    def get_by_natural_key(self, username):
+        # Authentication is (almost) always followed by a subscription check
+        return self.select_related("customer").get(
+            **{self.model.USERNAME_FIELD: username}
+        )
+
     def create_user(self, email, password, **extra_fields):
         """
         Create and save a user with the given email and password.
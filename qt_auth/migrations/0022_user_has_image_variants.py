@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("qt_auth", "0021_alter_user_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="has_image_variants",
+            field=models.BooleanField(default=False),
+        ),
+    ]
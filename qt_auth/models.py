@@ -1,42 +1,42 @@
 from datetime import datetime, timedelta
 
-import boto3
 import jwt
-import stripe
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.core.mail import EmailMultiAlternatives
-from django.db import models
-from django.db.models import Count, Max, Prefetch, Q
-from django.template.loader import render_to_string
+from django.db import models, transaction
+from django.db.models import Max, Prefetch
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django_fsm import FSMField, transition
+from djstripe.exceptions import MultipleSubscriptionException
 from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from qt_billing.portal import get_billing_portal_session
+from qt_billing.subscriptions import (
+    get_cached_subscription_status,
+    get_subscription_period_end,
+    set_cached_subscription_status,
+)
 from qt_security.checkers import validate_image_size_and_mime_type
-from qt_utils.helpers import aws_instance_directory_path, get_s3_image
+from qt_security.revocation import revocation_list
+from qt_security.tokens import OutstandingRefreshToken, get_outstanding_token
+from qt_utils.clients import get_stripe
+from qt_utils.helpers import aws_instance_directory_path, get_default_profile_image_url
+from qt_utils.images import generate_variants, get_variant_name, variant_executor
 from qt_utils.model_loaders import (
     get_blacklisted_jwt_token_model,
     get_blacklisted_token_model,
-    get_outstanding_token_model,
+    get_outgoing_email_model,
     get_session_model,
     get_stripe_customer_model,
 )
-from qt_utils.models import QTPrivateAssets, QTPublicAssets
+from qt_utils.models import QTPrivateAssets
+from qt_utils.storage import schedule_prefix_deletion
 
+from . import emails
 from .managers import CustomUserManager
 
-DEFAULT_PROFILE_IMAGE_KEY = "images/unkown_user.png"
-
-s3_resource = boto3.resource(
-    "s3",
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-)
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
 
 class User(AbstractUser):
     """
@@ -54,6 +54,7 @@ class User(AbstractUser):
         storage=QTPrivateAssets(),
         max_length=250,
     )
+    has_image_variants = models.BooleanField(default=False)
 
     are_guidelines_accepted = models.BooleanField(default=False)
     is_email_verified = models.BooleanField(default=False)
@@ -100,15 +101,44 @@ class User(AbstractUser):
 
     @property
     def billing_portal(self):
-        return stripe.billing_portal.Session.create(
-            customer=self.customer.id,
+        return get_billing_portal_session(
+            self.customer.id,
             return_url=f"{settings.WWW_URL}/platform/account/settings",
         )
 
     @property
     def get_image(self):
-        if self.image and self.image.url:
+        # Users without an uploaded image share the public default image
+        if self.image:
             return self.image.url
+        return get_default_profile_image_url()
+
+    def get_image_variant(self, size, image_format):
+        # Falls back to the original image until the variants are generated
+        if self.image and self.has_image_variants:
+            return self.image.storage.url(
+                get_variant_name(self.image.name, size, image_format)
+            )
+        return self.get_image
+
+    def generate_image_variants(self):
+        if not self.image:
+            return
+
+        with self.image.open("rb") as image_file:
+            for size, image_format, content in generate_variants(image_file):
+                self.image.storage.save(
+                    get_variant_name(self.image.name, size, image_format), content
+                )
+
+        User.objects.filter(pk=self.pk).update(has_image_variants=True)
+
+    @classmethod
+    def generate_image_variants_for_user(cls, user_id):
+        try:
+            cls.objects.get(pk=user_id).generate_image_variants()
+        except cls.DoesNotExist:
+            return
 
     @classmethod
     def create_user(
@@ -144,15 +174,12 @@ class User(AbstractUser):
                 _("You must accept the guidelines to make an account."),
             )
 
-        image = get_s3_image(QTPublicAssets.bucket_name, DEFAULT_PROFILE_IMAGE_KEY)
-
         new_user = cls.objects.create_user(
             email=email,
             password=password,
             first_name=first_name,
             last_name=last_name,
             are_guidelines_accepted=are_guidelines_accepted,
-            image=image,
         )
 
         return new_user
@@ -204,7 +231,7 @@ class User(AbstractUser):
     @classmethod
     def get_access_token_for_refresh_token(cls, refresh_token):
         try:
-            return RefreshToken(refresh_token)
+            return OutstandingRefreshToken(refresh_token)
         except TokenError:
             raise PermissionDenied(_("Unable to use token"))
 
@@ -218,6 +245,11 @@ class User(AbstractUser):
         if image is not None:
             validate_image_size_and_mime_type(image)
             self.image = image
+            # The variants are generated by a worker, once the image is saved
+            self.has_image_variants = False
+            variant_executor.submit_on_commit(
+                User.generate_image_variants_for_user, self.pk
+            )
 
         return self
 
@@ -241,16 +273,39 @@ class User(AbstractUser):
     def set_user_status_change_email(self):
         self.is_email_verified = False
 
+    @property
+    def stripe_customer_id(self):
+        # The Stripe id (cus_...) the webhooks refer to, `customer_id` is the
+        # dj-stripe primary key
+        return self.customer.id if self.customer_id else None
+
     def has_valid_subscription(self):
         # Check if current subscription is payd/valid
-        if self.customer.subscription and self.customer.subscription.is_valid():
-            return True
-        return False
+        if not self.customer_id:
+            return False
+
+        valid = get_cached_subscription_status(self.stripe_customer_id)
+        if valid is None:
+            valid = set_cached_subscription_status(
+                self.stripe_customer_id, self.get_current_subscription()
+            )
+        return valid
+
+    def get_current_subscription(self):
+        # Same as `customer.subscription`, but in a single query
+        if not self.customer_id:
+            return None
+        subscriptions = list(self.customer.valid_subscriptions[:2])
+        if len(subscriptions) > 1:
+            raise MultipleSubscriptionException(
+                "This customer has multiple subscriptions. Use Customer.subscriptions "
+                "to access them."
+            )
+        return subscriptions[0] if subscriptions else None
 
     def delete_aws_resources_for_user(self):
-        bucket = s3_resource.Bucket(QTPrivateAssets.bucket_name)
-        for obj in bucket.objects.filter(Prefix=f"user_{self.email}/"):
-            s3_resource.Object(QTPrivateAssets.bucket_name, obj.key).delete()
+        # Recorded, and deleted in a background thread once committed
+        schedule_prefix_deletion(QTPrivateAssets.bucket_name, f"user_{self.email}/")
 
     def cancel_current_subscription(self):
         # cancel current subscription(s), though it should be one!
@@ -286,7 +341,9 @@ class User(AbstractUser):
     def create_stripe_account(self):
         # Create new Stripe Customer for newly registerd QT user.
         # Can't be done via dj-stripe.
-        stripe_customer = stripe.Customer.create(email=self.email, name=self.full_name)
+        stripe_customer = get_stripe().Customer.create(
+            email=self.email, name=self.full_name
+        )
 
         # Sync database with newly created stripe customer
         Customer = get_stripe_customer_model()
@@ -295,214 +352,194 @@ class User(AbstractUser):
 
         return self
 
-    def send_email_verification_mail(self):
-        email_verification_token = self._create_token_for_purpose(
-            self.JWT_TOKEN_TYPE_VERIFY_EMAIL
-        )
-        mail_subject = _("[QT] Email verification")
-        text_content = render_to_string(
-            "qt_auth/email/verify_email.txt",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "email_verification_link": self._create_email_verification_link(
-                    email_verification_token
-                ),
-            },
-        )
+    def _get_mail_context(self, **context):
+        return {"www_url": settings.WWW_URL, "full_name": self.full_name, **context}
 
-        html_content = render_to_string(
-            "qt_auth/email/verify_email.html",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "email_verification_link": self._create_email_verification_link(
-                    email_verification_token
-                ),
-            },
+    def _queue_mail(self, composer, **context):
+        # Sent by the `send_outgoing_emails` command, outside of the request
+        subject, text_content, html_content = composer.render(
+            self._get_mail_context(**context)
         )
-
-        email = EmailMultiAlternatives(
-            mail_subject,
-            text_content,
-            to=[self.email],
+        OutgoingEmail = get_outgoing_email_model()
+        OutgoingEmail.enqueue(
+            to=self.email,
             from_email=f"QuantTrade <{settings.NO_REPLY_EMAIL_ADDRESS}>",
+            subject=subject,
+            text_content=text_content,
+            html_content=html_content,
         )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
 
-    def send_request_email_verification_mail(self):
+    def _get_email_verification_context(self):
         email_verification_token = self._create_token_for_purpose(
             self.JWT_TOKEN_TYPE_VERIFY_EMAIL
         )
-        mail_subject = _("[QT] New Email verification")
-        text_content = render_to_string(
-            "qt_auth/email/request_verify_email.txt",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "email_verification_link": self._create_email_verification_link(
-                    email_verification_token
-                ),
-            },
-        )
+        return {
+            "email_verification_link": self._create_email_verification_link(
+                email_verification_token
+            )
+        }
 
-        html_content = render_to_string(
-            "qt_auth/email/request_verify_email.html",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "email_verification_link": self._create_email_verification_link(
-                    email_verification_token
-                ),
-            },
-        )
+    def send_email_verification_mail(self):
+        self._queue_mail(emails.verify_email, **self._get_email_verification_context())
 
-        email = EmailMultiAlternatives(
-            mail_subject,
-            text_content,
-            to=[self.email],
-            from_email=f"QuantTrade <{settings.NO_REPLY_EMAIL_ADDRESS}>",
+    def send_request_email_verification_mail(self):
+        self._queue_mail(
+            emails.request_verify_email, **self._get_email_verification_context()
         )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
 
     def send_password_reset_mail(self):
         password_reset_token = self._create_token_for_purpose(
             self.JWT_TOKEN_TYPE_RESET_PASSWORD
         )
-        mail_subject = _("[QT] Password reset")
-        text_content = render_to_string(
-            "qt_auth/email/password_reset.txt",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "password_reset_link": self._create_password_reset_link(
-                    password_reset_token
-                ),
-            },
-        )
-
-        html_content = render_to_string(
-            "qt_auth/email/password_reset.html",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "password_reset_link": self._create_password_reset_link(
-                    password_reset_token
-                ),
-            },
-        )
-
-        email = EmailMultiAlternatives(
-            mail_subject,
-            text_content,
-            to=[self.email],
-            from_email=f"QuantTrade <{settings.NO_REPLY_EMAIL_ADDRESS}>",
+        self._queue_mail(
+            emails.password_reset,
+            password_reset_link=self._create_password_reset_link(password_reset_token),
         )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
 
     def send_email_reset_mail(self):
         email_reset_token = self._create_token_for_purpose(
             self.JWT_TOKEN_TYPE_RESET_EMAIL
         )
-        mail_subject = _("[QT] Change email")
-        text_content = render_to_string(
-            "qt_auth/email/email_reset.txt",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "email_reset_link": self._create_email_reset_link(email_reset_token),
-            },
+        self._queue_mail(
+            emails.email_reset,
+            email_reset_link=self._create_email_reset_link(email_reset_token),
         )
 
-        html_content = render_to_string(
-            "qt_auth/email/email_reset.html",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "email_reset_link": self._create_email_reset_link(email_reset_token),
-            },
-        )
-
-        email = EmailMultiAlternatives(
-            mail_subject,
-            text_content,
-            to=[self.email],
-            from_email=f"QuantTrade <{settings.NO_REPLY_EMAIL_ADDRESS}>",
-        )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
-
     def send_email_reset_verification_mail(self):
-        email_verification_token = self._create_token_for_purpose(
-            self.JWT_TOKEN_TYPE_VERIFY_EMAIL
-        )
-        mail_subject = _("[QT] Change email verification")
-        text_content = render_to_string(
-            "qt_auth/email/verify_email_reset.txt",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "email_verification_link": self._create_email_verification_link(
-                    email_verification_token
-                ),
-            },
+        self._queue_mail(
+            emails.verify_email_reset, **self._get_email_verification_context()
         )
 
-        html_content = render_to_string(
-            "qt_auth/email/verify_email_reset.html",
-            {
-                "www_url": settings.WWW_URL,
-                "full_name": self.full_name,
-                "email_verification_link": self._create_email_verification_link(
-                    email_verification_token
-                ),
-            },
+    @classmethod
+    def send_request_email_verification_mails(cls, users, language=None):
+        """
+        Queues a new email verification mail for each of the users,
+        rendered and stored in bulk. Returns the number of queued mails.
+        """
+        users = list(users)
+        contexts = (
+            user._get_mail_context(**user._get_email_verification_context())
+            for user in users
         )
-
-        email = EmailMultiAlternatives(
-            mail_subject,
-            text_content,
-            to=[self.email],
-            from_email=f"QuantTrade <{settings.NO_REPLY_EMAIL_ADDRESS}>",
+        rendered = emails.request_verify_email.render_many(contexts, language)
+
+        OutgoingEmail = get_outgoing_email_model()
+        outgoing_emails = OutgoingEmail.objects.bulk_create(
+            OutgoingEmail(
+                to=user.email,
+                from_email=f"QuantTrade <{settings.NO_REPLY_EMAIL_ADDRESS}>",
+                subject=subject,
+                text_content=text_content,
+                html_content=html_content,
+            )
+            for user, (subject, text_content, html_content) in zip(users, rendered)
         )
-        email.attach_alternative(html_content, "text/html")
-        email.send()
+        return len(outgoing_emails)
 
     def get_jwt_token(self):
-        refresh = RefreshToken.for_user(self)
-        return {"refresh": str(refresh), "access": str(refresh.access_token)}
+        token, _ = self.create_jwt_token()
+        return token
+
+    def create_jwt_token(self):
+        # Returns the token pair together with the created OutstandingToken
+        refresh = OutstandingRefreshToken.for_user(self)
+        token = {"refresh": str(refresh), "access": self.get_access_token(refresh)}
+        return token, refresh.outstanding_token
+
+    def get_access_token(self, refresh):
+        access = refresh.access_token
+        if settings.JWT_ENTITLEMENT_CLAIMS:
+            for claim, value in self.get_entitlement_claims().items():
+                access[claim] = value
+        return str(access)
+
+    def get_entitlement_claims(self):
+        # Claims that allow authorizing the (short lived) access token
+        # without loading the user, see EntitlementJWTAuthentication.
+        # HasValidSubscription checks the subscription, the status lets clients
+        # tell the account status (`account_status` of the login) from the token.
+        subscribed = False
+        subscription_expires_at = None
+
+        if self.customer_id:
+            subscription = self.get_current_subscription()
+            subscribed = set_cached_subscription_status(
+                self.stripe_customer_id, subscription
+            )
+            if subscribed:
+                period_end = get_subscription_period_end(subscription)
+                subscription_expires_at = int(period_end.timestamp())
+
+        return {
+            "status": self.status,
+            "subscribed": subscribed,
+            "subscription_expires_at": subscription_expires_at,
+        }
 
     def get_active_devices_and_sessions(self):
         Session = get_session_model()
-        return (
-            self.devices.prefetch_related(
+        now = timezone.now()
+        devices = list(
+            self.devices.filter(sessions__token__expires_at__gt=now)
+            .distinct()
+            .select_related("image")
+            .prefetch_related(
                 Prefetch(
                     queryset=Session.objects.filter(
-                        token__blacklistedtoken__isnull=True
-                    ),
+                        token__expires_at__gt=now
+                    ).select_related("token"),
                     lookup="sessions",
+                    to_attr="unexpired_sessions",
                 )
             )
-            .annotate(num_sessions=Count("sessions"))
-            .filter(
-                Q(sessions__token__blacklistedtoken__isnull=True),
-                num_sessions__gt=0,  # Filter out devices with zero sessions
-            )
-            .distinct()
         )
 
+        # Revoked (blacklisted) tokens are filtered with the revocation list,
+        # instead of joining the blacklist for every session
+        revoked = revocation_list.filter_revoked(
+            session.token.jti
+            for device in devices
+            for session in device.unexpired_sessions
+        )
+
+        active_devices = []
+        for device in devices:
+            device.active_sessions = []
+            for session in device.unexpired_sessions:
+                if session.token.jti not in revoked:
+                    session.active = True
+                    device.active_sessions.append(session)
+
+            # Filter out devices with zero active sessions
+            if device.active_sessions:
+                active_devices.append(device)
+
+        return active_devices
+
     def blacklist_all_outstanding_tokens(self):
-        outstanding_tokens = self.outstandingtoken_set.filter(blacklistedtoken=None)
+        # Two queries, no matter how many tokens the user has
+        outstanding_tokens = list(
+            self.outstandingtoken_set.filter(blacklistedtoken=None).values_list(
+                "id", "jti", "expires_at"
+            )
+        )
         BlacklistedToken = get_blacklisted_token_model()
-        for token in outstanding_tokens:
-            BlacklistedToken.objects.create(token=token)
+        BlacklistedToken.objects.bulk_create(
+            [
+                BlacklistedToken(token_id=token_id)
+                for token_id, _, _ in outstanding_tokens
+            ],
+            ignore_conflicts=True,
+        )
+
+        # bulk_create doesn't send the post_save signal that updates the list
+        revoked_tokens = [
+            (jti, expires_at) for _, jti, expires_at in outstanding_tokens
+        ]
+        transaction.on_commit(lambda: revocation_list.revoke_many(revoked_tokens))
 
     def blacklist_token(self, token):
-        OutstandingToken = get_outstanding_token_model()
-        outstanding_token = OutstandingToken.objects.get(token=token)
+        outstanding_token = get_outstanding_token(token)
         BlacklistedToken = get_blacklisted_token_model()
         BlacklistedToken.objects.create(token=outstanding_token)
 
@@ -2,7 +2,7 @@ from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 
 from qt.settings_base import NAME_MAX_LENGTH, PASSWORD_MAX_LENGTH, PASSWORD_MIN_LENGTH
-from qt_utils.serializer_fields import ImageField
+from qt_utils.serializer_fields import ImageVariantField
 
 from .validators import (
     outstanding_token_exists,
@@ -72,7 +72,7 @@ class GetAuthenticatedUserSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True)
     first_name = serializers.CharField(required=True)
     last_name = serializers.CharField(required=True)
-    image = ImageField()
+    image = ImageVariantField()
 
 
 class PatchAuthenticatedUserSerializer(serializers.Serializer):
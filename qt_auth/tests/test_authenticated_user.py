@@ -45,7 +45,7 @@ class AuthenticatedUserAPITests(APITestCase):
         self.assertEqual(response.data["email"], user.email)
         self.assertEqual(response.data["first_name"], user.first_name)
         self.assertEqual(response.data["last_name"], user.last_name)
-        self.assertEqual(response.data["image"], user.image)
+        self.assertEqual(response.data["image"], user.get_image)
 
     def test_patch_authenticated_user_without_subscription(self):
         """
@@ -88,7 +88,7 @@ class AuthenticatedUserAPITests(APITestCase):
         self.assertEqual(response.data["email"], user.email)
         self.assertEqual(response.data["first_name"], first_name)
         self.assertEqual(response.data["last_name"], last_name)
-        self.assertEqual(response.data["image"], user.image)
+        self.assertEqual(response.data["image"], user.get_image)
 
     def test_delete_authenticated_user_without_subscription(self):
         """
@@ -0,0 +1,31 @@
+from django.test import TestCase
+
+from qt_auth.factories import UserFactory
+from qt_utils.model_loaders import get_blacklisted_token_model
+
+
+class UserBlacklistTokensTests(TestCase):
+    """
+    Test blacklisting all outstanding tokens of a user
+    """
+
+    def test_blacklist_all_outstanding_tokens(self):
+        """
+        Should blacklist every token in a fixed number of queries
+        """
+        user = UserFactory()
+        other_user = UserFactory()
+        for _ in range(5):
+            user.get_jwt_token()
+        other_user.get_jwt_token()
+
+        BlacklistedToken = get_blacklisted_token_model()
+        BlacklistedToken.objects.create(token=user.outstandingtoken_set.first())
+
+        with self.assertNumQueries(2):
+            user.blacklist_all_outstanding_tokens()
+
+        self.assertEqual(BlacklistedToken.objects.filter(token__user=user).count(), 5)
+        self.assertFalse(
+            BlacklistedToken.objects.filter(token__user=other_user).exists()
+        )
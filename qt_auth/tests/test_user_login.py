@@ -1,3 +1,5 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from rest_framework import status
@@ -137,5 +139,28 @@ class UserLoginAPITests(APITestCase):
         self.assertIn("refresh", response.data["token"])
         self.assertIn("access", response.data["token"])
 
+    def test_login_query_count(self):
+        """
+        Succesfull login should only need a small, fixed number of queries
+        """
+        User = get_user_model()
+        user = UserFactory(status=User.STATUS_TYPE_VERIFIED)
+
+        url = self._get_url()
+
+        data = {
+            "email": user.email,
+            "password": "AhhYeahWakeupYeah",
+        }
+
+        # user, outstanding token, device images (index), device & session
+        # including the savepoints of both inserts
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["subscribed"], False)
+        self.assertLessEqual(len(context.captured_queries), 10)
+
     def _get_url(self):
         return reverse("user-login")
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import translation
+
+from qt_auth.emails import request_verify_email
+from qt_auth.factories import UserFactory
+from qt_utils.models import OutgoingEmail
+
+
+class UserMailTests(TestCase):
+    """
+    Test composing the auth mails
+    """
+
+    def test_send_email_verification_mail(self):
+        """
+        Should queue a mail with the same verification link in both parts
+        """
+        user = UserFactory()
+        user.send_email_verification_mail()
+
+        email = OutgoingEmail.objects.get(to=user.email)
+        link = next(
+            word for word in email.text_content.split() if "verify-email" in word
+        )
+        self.assertEqual(email.subject, "[QT] Email verification")
+        self.assertIn(user.full_name, email.text_content)
+        self.assertIn(link, email.html_content)
+
+    def test_templates_are_compiled_once(self):
+        """
+        Should reuse the compiled templates for the same language
+        """
+        request_verify_email.clear()
+        templates = request_verify_email.get_templates("en")
+
+        self.assertIs(request_verify_email.get_templates("en"), templates)
+
+    def test_render_many_restores_language(self):
+        """
+        Should only activate the language of the mails while rendering them
+        """
+        contexts = [{"first_name": "Jan", "link": "https://example.com"}] * 2
+
+        with translation.override("en"):
+            rendered = request_verify_email.render_many(contexts, "nl")
+
+            self.assertEqual(translation.get_language(), "en")
+        self.assertEqual(len(rendered), 2)
+
+    def test_resend_email_verification(self):
+        """
+        Should queue a mail for every unverified user in bulk
+        """
+        users = UserFactory.create_batch(3)
+        UserFactory(status="verified")
+
+        with self.assertNumQueries(3):
+            call_command("resend_email_verification", batch_size=2, stdout=StringIO())
+
+        self.assertEqual(
+            set(OutgoingEmail.objects.values_list("to", flat=True)),
+            {user.email for user in users},
+        )
@@ -0,0 +1,95 @@
+from io import BytesIO
+
+import boto3
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from moto import mock_s3
+from PIL import Image
+
+from qt_auth.factories import UserFactory
+from qt_utils.models import QTPrivateAssets
+
+
+@override_settings(DEFAULT_PROFILE_IMAGE_URL="https://assets.test/unknown_user.png")
+class UserProfileImageTests(TestCase):
+    """
+    Test the profile image of users without an uploaded image
+    """
+
+    def test_create_user_without_image(self):
+        """
+        Should not copy the default image for a new user
+        """
+        user = get_user_model().create_user(
+            email="new@example.com",
+            password="AhhYeahWakeupYeah",
+            first_name="Pluis",
+            last_name="Muis",
+            are_guidelines_accepted=True,
+        )
+
+        self.assertFalse(user.image)
+
+    def test_get_image_without_image(self):
+        """
+        Should return the shared default image
+        """
+        user = get_user_model()(email="new@example.com")
+
+        self.assertEqual(user.get_image, "https://assets.test/unknown_user.png")
+
+    @override_settings(
+        DEFAULT_PROFILE_IMAGE_URL=None,
+        AWS_S3_PUBLIC_ASSETS="public",
+        AWS_DEFAULT_REGION="eu-central-1",
+    )
+    def test_get_image_from_public_assets(self):
+        """
+        Should build the default image URL from the public assets bucket
+        """
+        user = get_user_model()(email="new@example.com")
+
+        self.assertEqual(
+            user.get_image,
+            "https://public.s3.eu-central-1.amazonaws.com/images/unkown_user.png",
+        )
+
+    @override_settings(DEFAULT_PROFILE_IMAGE_URL=None, AWS_S3_PUBLIC_ASSETS="")
+    def test_get_image_without_public_assets(self):
+        """
+        Should not return an URL to a bucket without a name
+        """
+        user = get_user_model()(email="new@example.com")
+
+        self.assertIsNone(user.get_image)
+
+    @mock_s3
+    def test_generate_image_variants(self):
+        """
+        Should store every variant and serve one once they are generated
+        """
+        boto3.resource("s3").create_bucket(
+            Bucket=QTPrivateAssets.bucket_name,
+            CreateBucketConfiguration={
+                "LocationConstraint": settings.AWS_DEFAULT_REGION
+            },
+        )
+        image_io = BytesIO()
+        Image.new("RGB", (600, 600)).save(image_io, format="PNG")
+
+        user = UserFactory()
+        with self.captureOnCommitCallbacks() as callbacks:
+            user.update(image=SimpleUploadedFile("a.png", image_io.getvalue()))
+            user.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotIn("_128.webp", user.get_image_variant(128, "webp"))
+
+        user.generate_image_variants()
+        user.refresh_from_db()
+
+        self.assertIn("profile_image_128.webp", user.get_image_variant(128, "webp"))
+        self.assertTrue(
+            user.image.storage.exists(f"user_{user.email}/profile_image_64.jpg")
+        )
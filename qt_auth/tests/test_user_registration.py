@@ -1,7 +1,6 @@
 import json
 
 import boto3
-import stripe
 from django.conf import settings
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -10,6 +9,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 
 from qt_auth.factories import UserFactory
+from qt_utils.clients import get_stripe
 from qt_utils.model_loaders import get_user_model
 from qt_utils.models import QTPrivateAssets
 from qt_utils.tests.helpers import clear_stripe_customers
@@ -264,7 +264,7 @@ class UserRegistrationTests(APITestCase):
         User = get_user_model()
         user = User.objects.get(email=data["email"])
 
-        stripe_customer = stripe.Customer.retrieve(user.customer.id)
+        stripe_customer = get_stripe().Customer.retrieve(user.customer.id)
 
         self.assertEqual(stripe_customer["name"], user.full_name)
         self.assertEqual(stripe_customer["email"], user.email)
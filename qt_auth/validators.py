@@ -1,7 +1,8 @@
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import ValidationError
 
-from qt_utils.model_loaders import get_outstanding_token_model, get_user_model
+from qt_security.tokens import filter_outstanding_tokens
+from qt_utils.model_loaders import get_user_model
 
 
 def user_email_not_taken_validator(email):
@@ -19,8 +20,7 @@ def user_email_exists_validator(email):
 
 
 def outstanding_token_exists(refresh_token):
-    OutstandingToken = get_outstanding_token_model()
-    if not OutstandingToken.objects.filter(token=refresh_token).exists():
+    if not filter_outstanding_tokens(refresh_token).exists():
         raise ValidationError(
             _("Oustanding token not found."),
         )
@@ -8,13 +8,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from qt_security.checkers import MaximumFileSizeUploadHandler
 from qt_security.permissions import HasValidSubscription
-from qt_utils.model_loaders import (
-    get_device_model,
-    get_outstanding_token_model,
-    get_session_model,
-    get_user_model,
-)
+from qt_security.tokens import filter_outstanding_tokens
+from qt_utils.images import get_requested_variant
+from qt_utils.model_loaders import get_device_model, get_session_model, get_user_model
 from qt_utils.responses import ApiMessageResponse
 
 from .serializers import (
@@ -185,11 +183,7 @@ class Login(APIView):
                 {"account_status": user.status}, status=status.HTTP_401_UNAUTHORIZED
             )
 
-        token = user.get_jwt_token()
-
-        # Save user request information
-        OutstandingToken = get_outstanding_token_model()
-        outstanding_token = OutstandingToken.objects.get(token=token["refresh"])
+        token, outstanding_token = user.create_jwt_token()
 
         Device = get_device_model()
         info, image = Device.get_information_from_request(request)
@@ -197,10 +191,10 @@ class Login(APIView):
         device, __ = Device.objects.get_or_create(user=user, info=info, image=image)
 
         Session = get_session_model()
-        city, country = Session.get_information_from_request(request)
+        ip_address, location = Session.get_information_from_request(request)
 
         with transaction.atomic():
-            Session.create_session(device, outstanding_token, city, country)
+            Session.create_session(device, outstanding_token, ip_address, location)
 
         return Response(
             {
@@ -230,7 +224,7 @@ class LoginRefreshToken(APIView):
         User = get_user_model()
 
         token = User.get_access_token_for_refresh_token(refresh_token)
-        user = User.objects.get(pk=token["user_id"])
+        user = User.objects.select_related("customer").get(pk=token["user_id"])
 
         if not token or not user:
             return Response(
@@ -244,25 +238,23 @@ class LoginRefreshToken(APIView):
             )
 
         # Update user request information
-        OutstandingToken = get_outstanding_token_model()
-        outstanding_token = OutstandingToken.objects.get(token=refresh_token)
-
         Session = get_session_model()
-        session = Session.objects.get(token=outstanding_token)
-        city, country = Session.get_information_from_request(request)
+        session = Session.objects.get(
+            token__in=filter_outstanding_tokens(refresh_token)
+        )
+        ip_address, location = Session.get_information_from_request(request)
 
         with transaction.atomic():
-            session.city = city
-            session.country = country
+            session.update_location(ip_address, location)
             session.updated_at = timezone.now()
             session.save()
 
         return Response(
             {
-                "access_token": str(token.access_token),
+                "access_token": user.get_access_token(token),
                 "account_status": user.status,
                 "subscribed": user.has_valid_subscription(),
-                "image": user.get_image,
+                "image": user.get_image_variant(*get_requested_variant(request)),
             },
             status=status.HTTP_200_OK,
         )
@@ -441,10 +433,15 @@ class AuthenticatedUser(APIView):
     )
 
     def get(self, request):
-        user_serializer = GetAuthenticatedUserSerializer(request.user)
+        user_serializer = GetAuthenticatedUserSerializer(
+            request.user, context={"request": request}
+        )
         return Response(user_serializer.data, status=status.HTTP_200_OK)
 
     def patch(self, request):
+        # Reject oversized images while the body is being read
+        request.upload_handlers.insert(0, MaximumFileSizeUploadHandler(request))
+
         serializer = PatchAuthenticatedUserSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
@@ -460,7 +457,9 @@ class AuthenticatedUser(APIView):
 
             user.save()
 
-        user_serializer = GetAuthenticatedUserSerializer(user)
+        user_serializer = GetAuthenticatedUserSerializer(
+            user, context={"request": request}
+        )
         return Response(user_serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request):
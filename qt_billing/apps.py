@@ -5,3 +5,7 @@ class QtBillingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "qt_billing"
     verbose_name = "Billing"
+
+    def ready(self):
+        # import signals in order to use them
+        import qt_billing.signals  # noqa
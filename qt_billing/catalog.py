@@ -0,0 +1,134 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import translation
+
+from qt_utils.model_loaders import (
+    get_product_util_model,
+    get_stripe_plan_model,
+    get_stripe_price_model,
+)
+
+from .serializers import ProductIntervalSerializer
+
+
+class ProductCatalog:
+    """
+    In-process snapshot of the serialized Products response per language and
+    currency, with a strong ETag, so the endpoint doesn't query or serialize
+    anything. The snapshots of all supported currencies are built at once from
+    a single price index.
+
+    Snapshots are dropped after a product, price, ProductUtil or unique selling
+    point changes (see signals.py), other processes pick up the change through
+    a version in the shared cache or, without a shared cache, once the
+    snapshot is older than its TTL.
+    """
+
+    version_cache_key = "product_catalog_version"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (language, currency): (data, etag, built at, version)
+        self._snapshots = {}
+
+    def get(self, language, currency):
+        """
+        Returns the (data, etag) of the catalog in the language and currency
+        """
+        version = None
+        if self._shared_cache is not None:
+            version = self._shared_cache.get(self.version_cache_key)
+
+        snapshot = self._snapshots.get((language, currency))
+        if (
+            snapshot is not None
+            and snapshot[3] == version
+            and time.monotonic() - snapshot[2] < settings.PRODUCT_CATALOG_TTL
+        ):
+            return snapshot[0], snapshot[1]
+
+        built_at = time.monotonic()
+        snapshots = {
+            (language, built_currency): (
+                data,
+                self._make_etag(language, built_currency, data),
+                built_at,
+                version,
+            )
+            for built_currency, data in self.build(language).items()
+        }
+        with self._lock:
+            self._snapshots.update(snapshots)
+
+        data, etag, _, _ = snapshots[(language, currency)]
+        return data, etag
+
+    def build(self, language):
+        """
+        Returns the catalog in the language for each of the supported currencies
+        """
+        Plan = get_stripe_plan_model()
+        Price = get_stripe_price_model()
+        ProductUtil = get_product_util_model()
+
+        # Prices of the listed products by (Stripe product id, currency)
+        price_index = {}
+        prices = Price.objects.filter(
+            currency__in=settings.SUPPORTED_CURRENCIES,
+            product__productutil__isnull=False,
+        )
+        for price in prices:
+            price_index.setdefault((price.product_id, price.currency), []).append(price)
+
+        with translation.override(language):
+            # Only the intervals of plans that can be bought, deduplicated
+            # and ordered by the database
+            intervals = (
+                Plan.objects.filter(active=True, product__productutil__isnull=False)
+                .order_by("interval")
+                .values_list("interval", flat=True)
+                .distinct()
+            )
+            products = ProductUtil.objects.select_related("product").prefetch_related(
+                "unique_selling_points"
+            )
+
+            combined_data = {
+                "intervals": list(intervals),
+                "products": list(products),
+            }
+            return {
+                currency: ProductIntervalSerializer(
+                    combined_data,
+                    context={"currency": currency, "price_index": price_index},
+                ).data
+                for currency in settings.SUPPORTED_CURRENCIES
+            }
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshots = {}
+        if self._shared_cache is not None:
+            try:
+                self._shared_cache.incr(self.version_cache_key)
+            except ValueError:
+                self._shared_cache.set(self.version_cache_key, 1, timeout=None)
+
+    @property
+    def _shared_cache(self):
+        if settings.PRODUCT_CATALOG_CACHE_ALIAS:
+            return caches[settings.PRODUCT_CATALOG_CACHE_ALIAS]
+
+    def _make_etag(self, language, currency, data):
+        content = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+        digest = hashlib.sha256(f"{language}:{currency}:{content}".encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+
+product_catalog = ProductCatalog()
@@ -0,0 +1,85 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from qt_utils.clients import get_stripe
+
+
+def _get_cache():
+    # Must be shared, as the webhooks forget sessions in a single process
+    if settings.CHECKOUT_SESSION_CACHE_ALIAS:
+        return caches[settings.CHECKOUT_SESSION_CACHE_ALIAS]
+
+
+def _make_cache_key(customer_id, price_id, parameters):
+    return f"checkout_session:{customer_id}:{price_id}:{parameters}"
+
+
+def get_parameters_hash(currency, **kwargs):
+    # Stripe rejects a reused idempotency key with different parameters,
+    # and a session in another currency or locale can't be reused.
+    return hashlib.sha256(
+        repr((currency, sorted(kwargs.items()))).encode()
+    ).hexdigest()[:16]
+
+
+def get_or_create_checkout_session(customer_id, price_id, currency, **kwargs):
+    """
+    Returns an open Checkout session of the customer for the price (and
+    parameters), reusing the previous one until shortly before it expires.
+    Sessions are only reused with a (shared) CHECKOUT_SESSION_CACHE_ALIAS.
+    """
+    parameters = get_parameters_hash(currency, **kwargs)
+    cache = _get_cache()
+    cache_key = _make_cache_key(customer_id, price_id, parameters)
+    if cache is not None:
+        checkout_session = cache.get(cache_key)
+        if checkout_session is not None:
+            return checkout_session
+
+    # Requests within the same window send the same idempotency key (and
+    # parameters), so Stripe returns the same session for concurrent requests
+    window = int(time.time() // settings.CHECKOUT_SESSION_IDEMPOTENCY_WINDOW)
+    window_end = (window + 1) * settings.CHECKOUT_SESSION_IDEMPOTENCY_WINDOW
+    expires_at = window_end + settings.CHECKOUT_SESSION_EXPIRY
+
+    stripe_checkout_session = get_stripe().checkout.Session.create(
+        customer=customer_id,
+        currency=currency,
+        line_items=[{"price": price_id, "quantity": 1}],
+        mode="subscription",
+        expires_at=expires_at,
+        metadata={"price_id": price_id, "parameters": parameters},
+        idempotency_key=(
+            f"checkout-session-{customer_id}-{price_id}-{window}-{parameters}"
+        ),
+        **kwargs,
+    )
+    checkout_session = {
+        "id": stripe_checkout_session.id,
+        "url": stripe_checkout_session.url,
+        "expires_at": stripe_checkout_session.expires_at,
+    }
+    if cache is None:
+        return checkout_session
+
+    # Stop handing out the session a while before it expires,
+    # so the customer has time to complete it
+    timeout = int(
+        checkout_session["expires_at"]
+        - time.time()
+        - settings.CHECKOUT_SESSION_REUSE_MARGIN
+    )
+    if timeout > 0:
+        cache.set(cache_key, checkout_session, timeout=timeout)
+
+    return checkout_session
+
+
+def forget_checkout_session(customer_id, price_id, parameters):
+    # The session is completed or expired, a new one has to be created
+    cache = _get_cache()
+    if cache is not None:
+        cache.delete(_make_cache_key(customer_id, price_id, parameters))
@@ -0,0 +1,60 @@
+from django.conf import settings
+
+from qt_utils.cache import TieredCache
+from qt_utils.model_loaders import get_stripe_price_model, get_user_model
+
+# Currency per user, so authenticated catalog requests don't query the database.
+# Dropped when the user or its customer is saved (see signals.py).
+customer_currency_cache = TieredCache(
+    "customer_currency",
+    max_size=settings.CUSTOMER_CURRENCY_CACHE_MAX_SIZE,
+    ttl=settings.CUSTOMER_CURRENCY_CACHE_TTL,
+    alias=settings.CUSTOMER_CURRENCY_CACHE_ALIAS,
+)
+
+
+def get_request_currency(request):
+    """
+    Returns the currency to show prices in: the `?currency=` query parameter,
+    the currency of the customer or the currency of the (Accept-Language)
+    language, in that order.
+    """
+    currency = request.query_params.get("currency", "").lower()
+    if currency in settings.SUPPORTED_CURRENCIES:
+        return currency
+
+    if request.user.is_authenticated:
+        currency = get_customer_currency(request.user.pk)
+        if currency in settings.SUPPORTED_CURRENCIES:
+            return currency
+
+    return settings.LANGUAGE_CURRENCIES.get(
+        request.LANGUAGE_CODE, settings.DEFAULT_CURRENCY
+    )
+
+
+def get_customer_currency(user_id):
+    currency = customer_currency_cache.get(user_id)
+    if currency is None:
+        # A single query, without loading the user or customer
+        User = get_user_model()
+        currency = (
+            User.objects.filter(pk=user_id)
+            .values_list("customer__currency", flat=True)
+            .first()
+        )
+        # Users without a (currency of their) customer are cached as well
+        currency = currency or ""
+        customer_currency_cache.set(user_id, currency)
+    return currency or None
+
+
+def forget_customer_currency(user_ids):
+    for user_id in user_ids:
+        customer_currency_cache.delete(user_id)
+
+
+def get_price_currency(price_id):
+    # Checkout has to be in the currency of the price that is bought
+    Price = get_stripe_price_model()
+    return Price.objects.filter(id=price_id).values_list("currency", flat=True).first()
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from qt_utils.clients import get_stripe
+
+
+def _get_cache():
+    # Only shared, a per-process cache misses whenever a visit lands on another worker
+    if settings.BILLING_PORTAL_CACHE_ALIAS:
+        return caches[settings.BILLING_PORTAL_CACHE_ALIAS]
+
+
+def _make_cache_key(customer_id):
+    return f"billing_portal:{customer_id}"
+
+
+def get_billing_portal_session(customer_id, return_url):
+    """
+    Returns a billing portal session of the customer, reusing the previous
+    one for as long as its URL is valid.
+    """
+    cache = _get_cache()
+    cache_key = _make_cache_key(customer_id)
+    if cache is not None:
+        billing_portal = cache.get(cache_key)
+        if billing_portal is not None:
+            return billing_portal
+
+    stripe_billing_portal = get_stripe().billing_portal.Session.create(
+        customer=customer_id, return_url=return_url
+    )
+    billing_portal = {
+        "id": stripe_billing_portal.id,
+        "url": stripe_billing_portal.url,
+    }
+
+    # The URL of a portal session is only valid for a short while after creation
+    valid_until = stripe_billing_portal.created + settings.BILLING_PORTAL_URL_VALIDITY
+    timeout = min(settings.BILLING_PORTAL_CACHE_TTL, int(valid_until - time.time()))
+    if cache is not None and timeout > 0:
+        cache.set(cache_key, billing_portal, timeout=timeout)
+
+    return billing_portal
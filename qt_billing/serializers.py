@@ -21,7 +21,14 @@ class ProductUtilSerializer(serializers.Serializer):
     name = serializers.CharField(source="product.name")
     unique_selling_points = UniqueSellingPointSerializer(many=True)
     featured = serializers.BooleanField(required=True)
-    prices = PriceSerializer(source="product.prices", many=True)
+    prices = serializers.SerializerMethodField()
+
+    def get_prices(self, product_util):
+        # The prices in the catalog currency, from the catalog's price index
+        prices = self.context["price_index"].get(
+            (product_util.product.id, self.context["currency"]), []
+        )
+        return PriceSerializer(prices, many=True).data
 
 
 class CheckoutSessionSerializer(serializers.Serializer):
@@ -35,6 +42,10 @@ class CheckoutSessionResponseSerializer(serializers.Serializer):
 class ProductIntervalSerializer(serializers.Serializer):
     products = ProductUtilSerializer(many=True)
     intervals = serializers.ListField()
+    currency = serializers.SerializerMethodField()
+
+    def get_currency(self, data):
+        return self.context["currency"]
 
 
 class BillingPortalSessionSerializer(serializers.Serializer):
@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from qt_utils.model_loaders import (
+    get_product_util_model,
+    get_stripe_customer_model,
+    get_stripe_plan_model,
+    get_stripe_price_model,
+    get_stripe_product_model,
+    get_unique_selling_point_model,
+    get_unique_selling_point_model_through_model,
+    get_user_model,
+)
+
+from .catalog import product_catalog
+from .currencies import forget_customer_currency
+
+CATALOG_MODELS = (
+    get_stripe_product_model(),
+    get_stripe_price_model(),
+    get_stripe_plan_model(),
+    get_product_util_model(),
+    get_unique_selling_point_model(),
+    get_unique_selling_point_model_through_model(),
+)
+
+
+def invalidate_product_catalog(sender, instance, *args, **kwargs):
+    # Drop the snapshots right away for this process, and again once the
+    # change is visible to other connections (a snapshot may be built in between)
+    product_catalog.invalidate()
+    transaction.on_commit(product_catalog.invalidate)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_product_catalog, sender=model)
+    post_delete.connect(invalidate_product_catalog, sender=model)
+
+
+def forget_user_currency(sender, instance, *args, **kwargs):
+    forget_customer_currency([instance.pk])
+
+
+def forget_customer_users_currency(sender, instance, *args, **kwargs):
+    User = get_user_model()
+    forget_customer_currency(
+        User.objects.filter(customer=instance).values_list("pk", flat=True)
+    )
+
+
+post_save.connect(forget_user_currency, sender=get_user_model())
+post_save.connect(forget_customer_users_currency, sender=get_stripe_customer_model())
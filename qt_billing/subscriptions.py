@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from qt_utils.cache import LRUCache
+from qt_utils.model_loaders import get_user_model
+
+# Without a shared cache only valid statuses are cached in-process, and briefly,
+# as the webhooks are unable to update the status in other processes.
+local_subscription_cache = LRUCache(
+    max_size=settings.SUBSCRIPTION_LOCAL_CACHE_MAX_SIZE,
+    ttl=settings.SUBSCRIPTION_LOCAL_CACHE_TTL,
+)
+
+
+def _get_shared_cache():
+    if settings.SUBSCRIPTION_CACHE_ALIAS:
+        return caches[settings.SUBSCRIPTION_CACHE_ALIAS]
+
+
+def _make_cache_key(customer_id):
+    return f"subscription_valid:{customer_id}"
+
+
+def get_cached_subscription_status(customer_id):
+    # Returns None when the status of the customer is not cached (yet)
+    shared_cache = _get_shared_cache()
+    if shared_cache is None:
+        return local_subscription_cache.get(_make_cache_key(customer_id))
+    return shared_cache.get(_make_cache_key(customer_id))
+
+
+def get_subscription_period_end(subscription):
+    # A valid subscription expires by itself at the end of its (trial) period
+    return max(
+        subscription.current_period_end,
+        subscription.trial_end or subscription.current_period_end,
+    )
+
+
+def set_cached_subscription_status(customer_id, subscription):
+    valid = bool(subscription and subscription.is_valid())
+    cache_key = _make_cache_key(customer_id)
+    shared_cache = _get_shared_cache()
+
+    timeout = settings.SUBSCRIPTION_CACHE_TTL
+    if shared_cache is None:
+        timeout = settings.SUBSCRIPTION_LOCAL_CACHE_TTL
+    if valid:
+        period_end = get_subscription_period_end(subscription)
+        seconds_left = int((period_end - timezone.now()).total_seconds())
+        timeout = max(min(timeout, seconds_left), 1)
+
+    if shared_cache is not None:
+        shared_cache.set(cache_key, valid, timeout=timeout)
+    elif valid:
+        local_subscription_cache.set(cache_key, valid, ttl=timeout)
+    else:
+        local_subscription_cache.delete(cache_key)
+
+    return valid
+
+
+def forget_subscription_status(customer_id):
+    cache_key = _make_cache_key(customer_id)
+    local_subscription_cache.delete(cache_key)
+    shared_cache = _get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(cache_key)
+
+
+def refresh_subscription_status(customer_id):
+    """
+    Recomputes the cached subscription status of the user(s) for a Stripe
+    customer, called from the dj-stripe webhook handlers.
+    """
+    User = get_user_model()
+    user = User.objects.filter(customer__id=customer_id).first()
+    if user is None:
+        forget_subscription_status(customer_id)
+        return None
+
+    return set_cached_subscription_status(customer_id, user.get_current_subscription())
@@ -0,0 +1,70 @@
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from qt_billing.portal import get_billing_portal_session
+from qt_utils.tests.helpers import StripeSessionTestMixin
+
+
+@override_settings(
+    BILLING_PORTAL_CACHE_ALIAS="default",
+    BILLING_PORTAL_CACHE_TTL=60 * 4,
+    BILLING_PORTAL_URL_VALIDITY=60 * 5,
+)
+class BillingPortalCacheTests(StripeSessionTestMixin, SimpleTestCase):
+    """
+    Test reusing billing portal sessions per customer
+    """
+
+    stripe_module = "qt_billing.portal"
+
+    def setUp(self):
+        super().setUp()
+        self.created = time.time()
+        self.create = self.mock_session_create(
+            self.stripe.billing_portal.Session.create,
+            "bps",
+            "https://billing.stripe.com/",
+            created=lambda kwargs: self.created,
+        )
+
+    def test_billing_portal_is_reused(self):
+        """
+        Should only create one session for repeated visits of a customer
+        """
+        first = get_billing_portal_session("cus_1", return_url="https://qt.test")
+        second = get_billing_portal_session("cus_1", return_url="https://qt.test")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["url"], "https://billing.stripe.com/bps_1")
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_billing_portal_per_customer(self):
+        """
+        Should create a session for every customer
+        """
+        get_billing_portal_session("cus_1", return_url="https://qt.test")
+        get_billing_portal_session("cus_2", return_url="https://qt.test")
+
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_expired_billing_portal_is_not_reused(self):
+        """
+        Should not cache a session whose URL is no longer valid
+        """
+        self.created = time.time() - 60 * 5
+
+        get_billing_portal_session("cus_1", return_url="https://qt.test")
+        get_billing_portal_session("cus_1", return_url="https://qt.test")
+
+        self.assertEqual(self.create.call_count, 2)
+
+    @override_settings(BILLING_PORTAL_CACHE_ALIAS=None)
+    def test_billing_portal_without_cache(self):
+        """
+        Should create a session for every visit without a shared cache
+        """
+        get_billing_portal_session("cus_1", return_url="https://qt.test")
+        get_billing_portal_session("cus_1", return_url="https://qt.test")
+
+        self.assertEqual(self.create.call_count, 2)
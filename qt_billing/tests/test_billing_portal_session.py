@@ -1,10 +1,22 @@
+import time
+from unittest import mock
+
+from django.test import override_settings
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from qt_auth.factories import UserSubscribedFactory, UserUnsubscribedFactory
-from qt_utils.tests.helpers import make_authentication_headers_auth_token
+from qt_auth.factories import (
+    UserFactory,
+    UserSubscribedFactory,
+    UserUnsubscribedFactory,
+)
+from qt_utils.model_loaders import get_stripe_customer_model
+from qt_utils.tests.helpers import (
+    StripeSessionTestMixin,
+    make_authentication_headers_auth_token,
+)
 
 
 class BillingPortalSessionAPITests(APITestCase):
@@ -45,3 +57,48 @@ class BillingPortalSessionAPITests(APITestCase):
 
     def _get_url(self):
         return reverse("portal")
+
+
+@override_settings(BILLING_PORTAL_CACHE_ALIAS="default")
+class BillingPortalSessionCacheAPITests(StripeSessionTestMixin, APITestCase):
+    """
+    Test reusing the billing portal session of the Billing Portal Session API
+    """
+
+    stripe_module = "qt_billing.portal"
+
+    def setUp(self):
+        super().setUp()
+        self.create = self.mock_session_create(
+            self.stripe.billing_portal.Session.create,
+            "bps",
+            "https://billing.stripe.com/",
+            created=lambda kwargs: time.time(),
+        )
+        subscription_patcher = mock.patch(
+            "qt_security.permissions.check_user_has_valid_subscription",
+            return_value=True,
+        )
+        subscription_patcher.start()
+        self.addCleanup(subscription_patcher.stop)
+
+    def test_get_billing_portal_session_is_reused(self):
+        """
+        Should return the same URL for repeat visits, creating one session
+        """
+        Customer = get_stripe_customer_model()
+        user = UserFactory(
+            customer=Customer.objects.create(id="cus_portal", livemode=False)
+        )
+        header = make_authentication_headers_auth_token(user)
+
+        first = self.client.get(reverse("portal"), **header, format="json")
+        second = self.client.get(reverse("portal"), **header, format="json")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(
+            first.data["billing_portal_url"], "https://billing.stripe.com/bps_1"
+        )
+        self.assertEqual(self.create.call_count, 1)
+        self.assertEqual(self.create.call_args.kwargs["customer"], "cus_portal")
@@ -0,0 +1,100 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from qt_billing.checkout import forget_checkout_session, get_or_create_checkout_session
+from qt_utils.tests.helpers import StripeSessionTestMixin
+
+
+@override_settings(
+    CHECKOUT_SESSION_CACHE_ALIAS="default",
+    CHECKOUT_SESSION_EXPIRY=60 * 60,
+    CHECKOUT_SESSION_REUSE_MARGIN=60 * 15,
+)
+class CheckoutSessionTests(StripeSessionTestMixin, SimpleTestCase):
+    """
+    Test reusing open Stripe Checkout sessions
+    """
+
+    stripe_module = "qt_billing.checkout"
+
+    def setUp(self):
+        super().setUp()
+        self.create = self.mock_session_create(
+            self.stripe.checkout.Session.create,
+            "cs",
+            "https://checkout.stripe.com/",
+            expires_at=lambda kwargs: kwargs["expires_at"],
+        )
+
+    def test_open_session_is_reused(self):
+        """
+        Should only create one session for the same customer and price
+        """
+        first = get_or_create_checkout_session("cus_1", "price_1", "usd")
+        second = get_or_create_checkout_session("cus_1", "price_1", "usd")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.create.call_count, 1)
+
+        idempotency_key = self.create.call_args.kwargs["idempotency_key"]
+        self.assertTrue(idempotency_key.startswith("checkout-session-cus_1-price_1-"))
+        self.assertGreater(self.create.call_args.kwargs["expires_at"], time.time())
+
+    def test_session_per_price(self):
+        """
+        Should create a new session for another price or customer
+        """
+        get_or_create_checkout_session("cus_1", "price_1", "usd")
+        get_or_create_checkout_session("cus_1", "price_2", "usd")
+        get_or_create_checkout_session("cus_2", "price_1", "usd")
+
+        self.assertEqual(self.create.call_count, 3)
+
+    def test_forgotten_session_is_recreated(self):
+        """
+        Should create a new session once the previous one is completed
+        """
+        get_or_create_checkout_session("cus_1", "price_1", "usd")
+        metadata = self.create.call_args.kwargs["metadata"]
+        forget_checkout_session("cus_1", metadata["price_id"], metadata["parameters"])
+        get_or_create_checkout_session("cus_1", "price_1", "usd")
+
+        self.assertEqual(self.create.call_count, 2)
+
+    @override_settings(CHECKOUT_SESSION_REUSE_MARGIN=60 * 60 * 2)
+    def test_session_close_to_expiry_is_not_reused(self):
+        """
+        Should not hand out a session that is about to expire
+        """
+        get_or_create_checkout_session("cus_1", "price_1", "usd")
+        get_or_create_checkout_session("cus_1", "price_1", "usd")
+
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_session_per_locale(self):
+        """
+        Should create a new session when the customer switched language
+        """
+        get_or_create_checkout_session("cus_1", "price_1", "usd", locale="en")
+        get_or_create_checkout_session("cus_1", "price_1", "usd", locale="nl")
+        get_or_create_checkout_session("cus_1", "price_1", "usd", locale="nl")
+
+        self.assertEqual(self.create.call_count, 2)
+
+    @override_settings(CHECKOUT_SESSION_CACHE_ALIAS=None)
+    def test_session_without_cache(self):
+        """
+        Should not reuse sessions without a shared cache, only rely on the
+        idempotency key
+        """
+        with mock.patch("qt_billing.checkout.time.time", return_value=time.time()):
+            get_or_create_checkout_session("cus_1", "price_1", "usd")
+            get_or_create_checkout_session("cus_1", "price_1", "usd")
+
+        self.assertEqual(self.create.call_count, 2)
+        first_key, second_key = (
+            call.kwargs["idempotency_key"] for call in self.create.call_args_list
+        )
+        self.assertEqual(first_key, second_key)
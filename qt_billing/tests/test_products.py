@@ -1,10 +1,19 @@
 import json
 
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from qt_billing.factories import ProductUtilFactory
+from qt_auth.factories import UserFactory
+from qt_billing.catalog import product_catalog
+from qt_billing.currencies import customer_currency_cache
+from qt_billing.factories import ProductFactory, ProductUtilFactory
+from qt_utils.model_loaders import (
+    get_stripe_customer_model,
+    get_stripe_plan_model,
+    get_stripe_price_model,
+)
 
 
 class ProductsAPITests(APITestCase):
@@ -96,5 +105,166 @@ class ProductsAPITests(APITestCase):
         self.assertEqual(len(parsed_response["products"][0]["prices"]), 0)
         self.assertEqual(parsed_response["products"][0]["prices"], [])
 
+    def test_get_products_etag(self):
+        """
+        Should return 304 when the catalog didn't change since the given ETag
+        """
+        product_catalog.invalidate()
+        url = self._get_url()
+
+        response = self.client.get(url, format="json")
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_get_products_etag_after_change(self):
+        """
+        Should return 200 & the changed catalog after a product is saved
+        """
+        product_catalog.invalidate()
+        url = self._get_url()
+
+        etag = self.client.get(url, format="json")["ETag"]
+        ProductUtilFactory()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, format="json")
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(parsed_response["products"]), 1)
+
+    def test_get_products_etag_per_language(self):
+        """
+        Should return a different ETag per language
+        """
+        ProductUtilFactory()
+        url = self._get_url()
+
+        etag_en = self.client.get(url, format="json")["ETag"]
+        etag_nl = self.client.get(
+            url, HTTP_ACCEPT_LANGUAGE="nl-NL;q=1.0", format="json"
+        )["ETag"]
+
+        self.assertNotEqual(etag_en, etag_nl)
+
+    def test_get_products_cached(self):
+        """
+        Should not query the database when the catalog is cached
+        """
+        ProductUtilFactory()
+        url = self._get_url()
+        self.client.get(url, format="json")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_products_intervals(self):
+        """
+        Should only return the intervals of active plans of listed products
+        """
+        product_util = ProductUtilFactory()
+        unlisted_product = ProductFactory()
+
+        Plan = get_stripe_plan_model()
+        for plan_id, interval, product, active in (
+            ("plan_year", "year", product_util.product, True),
+            ("plan_month", "month", product_util.product, True),
+            ("plan_month_2", "month", product_util.product, True),
+            ("plan_week", "week", product_util.product, False),
+            ("plan_day", "day", unlisted_product, True),
+        ):
+            Plan.objects.create(
+                id=plan_id,
+                product=product,
+                active=active,
+                interval=interval,
+                currency="usd",
+                amount=10,
+                livemode=False,
+            )
+
+        response = self.client.get(self._get_url(), format="json")
+        parsed_response = json.loads(response.content)
+
+        self.assertEqual(parsed_response["intervals"], ["month", "year"])
+
+    def test_get_products_currency(self):
+        """
+        Should return the prices in the requested or the language's currency
+        """
+        product_util = ProductUtilFactory()
+        Price = get_stripe_price_model()
+        for price_id, currency in (("price_usd", "usd"), ("price_eur", "eur")):
+            Price.objects.create(
+                id=price_id,
+                product=product_util.product,
+                currency=currency,
+                unit_amount=1000,
+                recurring={"interval": "month"},
+                active=True,
+                livemode=False,
+            )
+        url = self._get_url()
+
+        for query, headers, currency in (
+            ({}, {}, "usd"),
+            ({}, {"HTTP_ACCEPT_LANGUAGE": "nl-NL;q=1.0"}, "eur"),
+            ({"currency": "eur"}, {}, "eur"),
+            ({"currency": "USD"}, {"HTTP_ACCEPT_LANGUAGE": "nl-NL;q=1.0"}, "usd"),
+            ({"currency": "gbp"}, {}, "usd"),
+        ):
+            response = self.client.get(url, query, **headers)
+            parsed_response = json.loads(response.content)
+
+            self.assertEqual(parsed_response["currency"], currency)
+            self.assertEqual(
+                [price["id"] for price in parsed_response["products"][0]["prices"]],
+                [f"price_{currency}"],
+            )
+
+    def test_get_products_all_currencies_built_once(self):
+        """
+        Should serve every currency from memory after the first request
+        """
+        ProductUtilFactory()
+        url = self._get_url()
+        etag_usd = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(0):
+            etag_eur = self.client.get(url, {"currency": "eur"})["ETag"]
+
+        self.assertNotEqual(etag_usd, etag_eur)
+
+    @override_settings(JWT_ENTITLEMENT_CLAIMS=True)
+    def test_get_products_authenticated_without_queries(self):
+        """
+        Should serve the customer's currency from memory after the first request
+        """
+        customer_currency_cache.clear()
+        Customer = get_stripe_customer_model()
+        customer = Customer.objects.create(id="cus_eur", currency="eur", livemode=False)
+        user = UserFactory(customer=customer)
+        header = {"HTTP_AUTHORIZATION": f"Bearer {user.get_jwt_token()['access']}"}
+        ProductUtilFactory()
+        url = self._get_url()
+        self.client.get(url, **header)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, **header)
+
+        self.assertEqual(json.loads(response.content)["currency"], "eur")
+
+        customer.currency = "usd"
+        customer.save()
+        response = self.client.get(url, **header)
+
+        self.assertEqual(json.loads(response.content)["currency"], "usd")
+
     def _get_url(self):
         return reverse("products")
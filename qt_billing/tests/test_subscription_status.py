@@ -0,0 +1,112 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from qt_auth.factories import UserFactory
+from qt_billing.subscriptions import (
+    get_cached_subscription_status,
+    local_subscription_cache,
+    refresh_subscription_status,
+    set_cached_subscription_status,
+)
+from qt_billing.webhooks import subscription_changed_handler
+from qt_utils.model_loaders import get_stripe_customer_model, get_user_model
+
+
+@override_settings(SUBSCRIPTION_CACHE_ALIAS="default")
+class SubscriptionStatusTests(TestCase):
+    """
+    Test the cached subscription status of a user
+    """
+
+    def setUp(self):
+        cache.clear()
+        Customer = get_stripe_customer_model()
+        self.customer = Customer.objects.create(id="cus_test", livemode=False)
+        self.user = UserFactory(customer=self.customer)
+
+    def test_subscription_status_is_cached(self):
+        """
+        Should only query the subscription once
+        """
+        self.assertFalse(self.user.has_valid_subscription())
+
+        with self.assertNumQueries(0):
+            self.assertFalse(self.user.has_valid_subscription())
+
+    def test_subscription_status_without_customer(self):
+        """
+        Should not have a valid subscription
+        """
+        user = UserFactory()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(user.has_valid_subscription())
+
+    def test_refresh_subscription_status(self):
+        """
+        Should update the cached status for the customer
+        """
+        refresh_subscription_status(self.customer.id)
+
+        self.assertIs(get_cached_subscription_status(self.customer.id), False)
+
+    def test_webhook_updates_status_of_user(self):
+        """
+        Should serve the status refreshed by a webhook to the user
+        """
+        self.assertFalse(self.user.has_valid_subscription())
+
+        subscription = mock.Mock(
+            current_period_end=timezone.now() + timedelta(days=30), trial_end=None
+        )
+        subscription.is_valid.return_value = True
+        event = SimpleNamespace(data={"object": {"customer": self.customer.id}})
+        with mock.patch.object(
+            get_user_model(), "get_current_subscription", return_value=subscription
+        ):
+            subscription_changed_handler(event)
+
+        user = get_user_model().objects.select_related("customer").get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_valid_subscription())
+
+
+@override_settings(SUBSCRIPTION_CACHE_ALIAS=None)
+class LocalSubscriptionStatusTests(TestCase):
+    """
+    Test the in-process subscription status, without a shared cache
+    """
+
+    def setUp(self):
+        local_subscription_cache.clear()
+
+    def tearDown(self):
+        local_subscription_cache.clear()
+
+    def test_invalid_status_is_not_cached(self):
+        """
+        Should not cache an invalid subscription, other processes can't update it
+        """
+        set_cached_subscription_status("cus_test", None)
+
+        self.assertIsNone(get_cached_subscription_status("cus_test"))
+
+    @override_settings(SUBSCRIPTION_LOCAL_CACHE_TTL=30)
+    def test_valid_status_is_cached_briefly(self):
+        """
+        Should cache a valid subscription for the local TTL only
+        """
+        subscription = mock.Mock(
+            current_period_end=timezone.now() + timedelta(days=30), trial_end=None
+        )
+        subscription.is_valid.return_value = True
+
+        with mock.patch.object(local_subscription_cache, "set") as cache_set:
+            set_cached_subscription_status("cus_test", subscription)
+
+        cache_set.assert_called_once_with("subscription_valid:cus_test", True, ttl=30)
@@ -1,52 +1,38 @@
-import stripe
 from django.conf import settings
-from django.db.models import Prefetch
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from qt_security.permissions import HasValidSubscription
-from qt_utils.model_loaders import (
-    get_product_util_model,
-    get_stripe_plan_model,
-    get_stripe_price_model,
-)
 
+from .catalog import product_catalog
+from .checkout import get_or_create_checkout_session
+from .currencies import get_price_currency, get_request_currency
 from .serializers import (
     BillingPortalSessionSerializer,
     CheckoutSessionResponseSerializer,
     CheckoutSessionSerializer,
-    ProductIntervalSerializer,
 )
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
 
 class Products(APIView):
     def get(self, request):
-        Plan = get_stripe_plan_model()
-        Price = get_stripe_price_model()
-
-        intervals = Plan.objects.values_list("interval", flat=True)
-
-        ProductUtil = get_product_util_model()
-        products = ProductUtil.objects.prefetch_related(
-            "product",
-            "unique_selling_points",
-            Prefetch(
-                "product__prices",
-                queryset=Price.objects.filter(currency="usd"),
-            ),
-        ).all()
+        currency = get_request_currency(request)
+        data, etag = product_catalog.get(request.LANGUAGE_CODE, currency)
 
-        combined_data = {
-            "intervals": sorted(set(intervals)),
-            "products": products,
-        }
-        response_serializer = ProductIntervalSerializer(combined_data)
+        headers = {"ETag": etag}
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and {etag, "*"} & set(parse_etags(if_none_match)):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        else:
+            response = Response(data, status=status.HTTP_200_OK, headers=headers)
 
-        return Response(response_serializer.data, status=status.HTTP_200_OK)
+        # The currency can depend on the customer
+        patch_vary_headers(response, ("Authorization",))
+        return response
 
 
 class CheckoutSession(APIView):
@@ -65,14 +51,14 @@ class CheckoutSession(APIView):
 
     def valid_request_data(self, request, data):
         try:
-            checkout_session = stripe.checkout.Session.create(
+            checkout_session = get_or_create_checkout_session(
+                customer_id=request.user.customer.id,
+                price_id=data["price_id"],
+                currency=get_price_currency(data["price_id"])
+                or get_request_currency(request),
                 client_reference_id=request.user.id,
                 payment_method_types=["card", "paypal"],
-                customer=request.user.customer.id,
                 locale=request.LANGUAGE_CODE,
-                currency="usd",
-                line_items=[{"price": data["price_id"], "quantity": 1}],
-                mode="subscription",
                 success_url=settings.WWW_URL
                 + "/platform/billing/success?session_id={CHECKOUT_SESSION_ID}",
                 cancel_url=settings.WWW_URL + "/platform/billing",
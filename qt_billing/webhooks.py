@@ -5,6 +5,9 @@ from rest_framework.response import Response
 
 from qt_utils.model_loaders import get_user_model
 
+from .checkout import forget_checkout_session
+from .subscriptions import refresh_subscription_status
+
 
 @webhooks.handler("checkout.session.completed")
 def my_handler(event, **kwargs):
@@ -17,4 +20,36 @@ def my_handler(event, **kwargs):
         user.cancel_old_subscriptions()
         user.save()
 
+    refresh_subscription_status(customer_id)
+    forget_checkout_session_for_event(event)
+
+    return Response(status=status.HTTP_200_OK)
+
+
+@webhooks.handler("checkout.session.expired")
+def checkout_session_expired_handler(event, **kwargs):
+    forget_checkout_session_for_event(event)
+
+    return Response(status=status.HTTP_200_OK)
+
+
+def forget_checkout_session_for_event(event):
+    checkout_session = event.data["object"]
+    metadata = checkout_session.get("metadata") or {}
+    if metadata.get("price_id") and metadata.get("parameters"):
+        forget_checkout_session(
+            checkout_session["customer"], metadata["price_id"], metadata["parameters"]
+        )
+
+
+@webhooks.handler(
+    "customer.subscription.created",
+    "customer.subscription.updated",
+    "customer.subscription.deleted",
+)
+def subscription_changed_handler(event, **kwargs):
+    customer_id = event.data["object"]["customer"]
+
+    refresh_subscription_status(customer_id)
+
     return Response(status=status.HTTP_200_OK)
@@ -62,6 +62,8 @@ class SessionInline(admin.TabularInline):
         "token",
         "city",
         "country",
+        "ip_address",
+        "location_pending",
         "created_at",
         "updated_at",
     )
@@ -72,6 +74,8 @@ class SessionAdmin(admin.ModelAdmin):
         "token",
         "city",
         "country",
+        "ip_address",
+        "location_pending",
         "created_at",
         "updated_at",
     )
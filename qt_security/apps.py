@@ -5,3 +5,7 @@ class QtSecurityConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "qt_security"
     verbose_name = "Security"
+
+    def ready(self):
+        # import signals in order to use them
+        import qt_security.signals  # noqa
@@ -0,0 +1,92 @@
+from functools import partial
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from qt_utils.cache import LRUCache
+
+# Whether a user exists and is active, so a deactivated or deleted user
+# loses access within the TTL instead of once the access token expires.
+active_user_cache = LRUCache(
+    max_size=settings.ACTIVE_USER_CACHE_MAX_SIZE,
+    ttl=settings.ACTIVE_USER_CACHE_TTL,
+)
+
+
+class LazyTokenUser(SimpleLazyObject):
+    """
+    The user of an access token with entitlement claims.
+    Authorization only uses the token, the user itself is only loaded from
+    the database once a view accesses one of its attributes.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, validated_token, func):
+        super().__init__(func)
+        self.__dict__["token"] = validated_token
+
+    def __bool__(self):
+        return True
+
+    @property
+    def pk(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    id = pk
+
+
+class EntitlementJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that doesn't load the user for access tokens
+    carrying entitlement claims (see User.get_entitlement_claims),
+    only whether the user is (still) active.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if "subscribed" not in validated_token:
+            return self.get_user_with_customer(user_id)
+
+        is_active = active_user_cache.get(user_id)
+        if is_active is None:
+            is_active = (
+                self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+                .values_list("is_active", flat=True)
+                .first()
+            )
+            active_user_cache.set(user_id, is_active)
+
+        # Same errors as JWTAuthentication.get_user
+        if is_active is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return LazyTokenUser(
+            validated_token, partial(self.get_user_with_customer, user_id)
+        )
+
+    def get_user_with_customer(self, user_id):
+        # JWTAuthentication.get_user, but with the Stripe customer that the
+        # subscription status is cached for (see User.has_valid_subscription)
+        try:
+            user = self.user_model.objects.select_related("customer").get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -1,26 +1,59 @@
 import magic
 from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
 from django.utils.translation import gettext_lazy as _
+from PIL import Image
 from rest_framework.exceptions import ValidationError
 
 
+class MaximumFileSizeUploadHandler(FileUploadHandler):
+    """
+    Rejects an upload as soon as one of its files exceeds the maximum size,
+    before the rest of the request body is read.
+    Must be the first upload handler, so the chunks don't get stored first.
+    """
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.MAXIMUM_FILE_SIZE:
+            raise ValidationError(_("File size exceeds the maximum limit of 10MB."))
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
 def validate_image_size_and_mime_type(image):
     # Check file size
     if image.size > settings.MAXIMUM_FILE_SIZE:
         raise ValidationError(_("File size exceeds the maximum limit of 10MB."))
 
-    # Check MIME type
+    # Check MIME type, based on the header of the file only
+    try:
+        image.seek(0)
+        mime_type = magic.from_buffer(image.read(settings.MIME_SNIFF_SIZE), mime=True)
+    except Exception:
+        raise ValidationError(
+            _("Error while validating the image. Make sure it is a valid image file.")
+        )
+
+    if mime_type not in settings.SUPPORTED_MEDIA_MIMETYPES:
+        raise ValidationError(
+            _("Invalid image format. Only GIF, JPEG, and PNG are allowed.")
+        )
+
+    # Check the dimensions, opening an image only parses its header
     try:
-        mime_type = magic.from_buffer(image.read(), mime=True)
-        if mime_type not in settings.SUPPORTED_MEDIA_MIMETYPES:
-            raise ValidationError(
-                _("Invalid image format. Only GIF, JPEG, and PNG are allowed.")
-            )
+        image.seek(0)
+        with Image.open(image) as parsed_image:
+            width, height = parsed_image.size
     except Exception:
         raise ValidationError(
             _("Error while validating the image. Make sure it is a valid image file.")
         )
 
+    if max(width, height) > settings.MAXIMUM_IMAGE_DIMENSION:
+        raise ValidationError(_("Image dimensions exceed the maximum of 8192 pixels."))
+
     # Reset file cursor back to the beginning so that it can be saved later
     image.seek(0)
 
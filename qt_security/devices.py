@@ -0,0 +1,37 @@
+from django.conf import settings
+from user_agents import parse
+
+from qt_utils.cache import LRUCache
+
+from .indexes import device_image_index
+
+DEFAULT_DEVICE_INFO = "Other / Other / Other"
+
+user_agent_cache = LRUCache(
+    max_size=settings.USER_AGENT_CACHE_MAX_SIZE, ttl=settings.USER_AGENT_CACHE_TTL
+)
+
+
+def parse_device_info(user_agent):
+    if not user_agent:
+        return DEFAULT_DEVICE_INFO
+    return str(parse(user_agent))
+
+
+def resolve_user_agent(user_agent):
+    """
+    Returns the device info and DeviceImage for a user agent.
+    Parsing and matching only happens once per distinct user agent per process,
+    `user_agent_cache.stats()` shows how effective that is.
+    """
+    resolved = user_agent_cache.get(user_agent)
+    if resolved is None:
+        info = parse_device_info(user_agent)
+        device_image = device_image_index.match(info)
+        resolved = (info, device_image.pk if device_image else None)
+        user_agent_cache.set(user_agent, resolved)
+
+    info, image_id = resolved
+    if image_id is None:
+        return info, None
+    return info, device_image_index.get(image_id)
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from qt_utils.background import BackgroundExecutor
+from qt_utils.model_loaders import get_session_model
+
+from .geolocation import UNKNOWN_LOCATION, get_location_from_ip
+
+enrichment_executor = BackgroundExecutor(
+    "session-enrichment",
+    workers_setting="GEOLOCATION_ENRICHMENT_WORKERS",
+    error_message="Failed to enrich the location of sessions",
+)
+
+_queue = set()
+_lock = threading.Lock()
+_drain_scheduled = False
+
+
+def schedule_session_enrichment(session_id):
+    # Only queue the session once the row is committed,
+    # otherwise the worker thread is unable to see it.
+    transaction.on_commit(lambda: _enqueue(session_id))
+
+
+def _enqueue(session_id):
+    global _drain_scheduled
+    with _lock:
+        _queue.add(session_id)
+        if _drain_scheduled:
+            return
+        _drain_scheduled = True
+
+    enrichment_executor.submit(_drain)
+
+
+def _drain():
+    # Sessions queued while a drain is pending are handled in the same run
+    global _drain_scheduled
+    with _lock:
+        session_ids = sorted(_queue)
+        _queue.clear()
+        _drain_scheduled = False
+
+    batch_size = settings.GEOLOCATION_ENRICHMENT_BATCH_SIZE
+    for start in range(0, len(session_ids), batch_size):
+        end = start + batch_size
+        enrich_sessions(session_ids[start:end], batch_size=batch_size)
+
+
+def enrich_sessions(session_ids=None, batch_size=None):
+    """
+    Resolves the location of pending sessions, doing a single lookup per
+    distinct IP address. Sessions that could not be resolved stay pending,
+    so they are picked up by the `enrich_session_locations` command.
+    Returns the number of sessions that were enriched.
+    """
+    Session = get_session_model()
+    batch_size = batch_size or settings.GEOLOCATION_ENRICHMENT_BATCH_SIZE
+
+    sessions = Session.objects.filter(location_pending=True)
+    if session_ids is not None:
+        sessions = sessions.filter(pk__in=session_ids)
+    sessions = list(sessions.only("id", "ip_address").order_by("pk")[:batch_size])
+
+    locations = {}
+    enriched_sessions = []
+    for session in sessions:
+        if session.ip_address not in locations:
+            locations[session.ip_address] = _get_location_with_retries(
+                session.ip_address
+            )
+
+        location = locations[session.ip_address]
+        if location is None:
+            continue
+
+        session.city, session.country = location
+        session.location_pending = False
+        enriched_sessions.append(session)
+
+    Session.objects.bulk_update(
+        enriched_sessions, ["city", "country", "location_pending"]
+    )
+
+    return len(enriched_sessions)
+
+
+def _get_location_with_retries(ip_address):
+    if not ip_address:
+        return UNKNOWN_LOCATION
+
+    retries = settings.GEOLOCATION_ENRICHMENT_RETRIES
+    for attempt in range(retries + 1):
+        location = get_location_from_ip(ip_address, default=None)
+        if location is not None:
+            return location
+        if attempt < retries:
+            time.sleep(settings.GEOLOCATION_ENRICHMENT_BACKOFF * 2**attempt)
+
+    return None
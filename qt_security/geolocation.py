@@ -0,0 +1,131 @@
+import ipaddress
+import logging
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from qt_utils.cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_LOCATION = ("", "")
+
+location_cache = TieredCache(
+    "geolocation",
+    max_size=settings.GEOLOCATION_CACHE_MAX_SIZE,
+    ttl=settings.GEOLOCATION_CACHE_TTL,
+    alias=settings.GEOLOCATION_CACHE_ALIAS,
+)
+
+
+class BaseGeolocationBackend(ABC):
+    """
+    Resolves an IP address to a (city, country) tuple.
+    Backends return None when they are unable to resolve the IP address,
+    so the next configured backend gets a chance.
+    """
+
+    @abstractmethod
+    def get_location(self, ip_address):
+        pass
+
+
+class GeoIPDatabaseBackend(BaseGeolocationBackend):
+    """
+    Looks up IP addresses in a local MaxMind (GeoIP2 / GeoLite2 City) database.
+    The database is memory-mapped once per process, lookups don't do any I/O.
+    The backend is disabled when the database can't be opened.
+    """
+
+    def __init__(self):
+        self.reader = None
+
+        if settings.GEOIP_DATABASE_PATH:
+            import maxminddb
+
+            try:
+                self.reader = maxminddb.open_database(
+                    settings.GEOIP_DATABASE_PATH, maxminddb.MODE_MMAP
+                )
+            except (OSError, ValueError, maxminddb.InvalidDatabaseError):
+                logger.exception(
+                    "Failed to open the GeoIP database %s, disabling its lookups",
+                    settings.GEOIP_DATABASE_PATH,
+                )
+
+    def get_location(self, ip_address):
+        if self.reader is None:
+            return None
+
+        import maxminddb
+
+        try:
+            record = self.reader.get(ip_address)
+        except (ValueError, maxminddb.InvalidDatabaseError):
+            # e.g. an IPv6 address in an IPv4 only database
+            return None
+        if not record:
+            return None
+
+        city = record.get("city", {}).get("names", {}).get("en", "")
+        country = record.get("country", {}).get("names", {}).get("en", "")
+
+        return city, country
+
+
+class IPGeolocationAPIBackend(BaseGeolocationBackend):
+    """
+    Looks up IP addresses via the ipgeolocation.io HTTP API,
+    only meant as a fallback for the local database.
+    """
+
+    url = "https://api.ipgeolocation.io/ipgeo"
+
+    def get_location(self, ip_address):
+        if not settings.GEOLOCATION_API_KEY:
+            return None
+
+        try:
+            response = requests.get(
+                self.url,
+                params={"apiKey": settings.GEOLOCATION_API_KEY, "ip": ip_address},
+                timeout=settings.GEOLOCATION_API_TIMEOUT,
+            )
+            response.raise_for_status()
+            parsed_response = response.json()
+        except (requests.RequestException, ValueError):
+            return None
+
+        return parsed_response.get("city", ""), parsed_response.get("country_name", "")
+
+
+@lru_cache(maxsize=None)
+def get_geolocation_backends():
+    # Backends are instantiated once per process, so the database is only opened once
+    return tuple(
+        import_string(backend_path)() for backend_path in settings.GEOLOCATION_BACKENDS
+    )
+
+
+def get_location_from_ip(ip_address, default=UNKNOWN_LOCATION):
+    try:
+        if not ipaddress.ip_address(ip_address).is_global:
+            return UNKNOWN_LOCATION
+    except ValueError:
+        return UNKNOWN_LOCATION
+
+    location = location_cache.get(ip_address)
+    if location is not None:
+        return tuple(location)
+
+    for backend in get_geolocation_backends():
+        location = backend.get_location(ip_address)
+        if location is not None:
+            # Only cache resolved locations, so failed lookups are retried
+            location_cache.set(ip_address, location)
+            return location
+
+    return default
@@ -0,0 +1,126 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from qt_utils.cache import LRUCache
+from qt_utils.model_loaders import get_device_image_model
+
+_missing = object()
+
+
+class DeviceImageIndex:
+    """
+    In-process index of all DeviceImage descriptions, so matching the
+    device info of a request with an image doesn't query the database.
+
+    The index is rebuilt after a DeviceImage is saved or deleted (see signals.py),
+    other processes pick up the change through a version in the shared cache,
+    which is checked at most once per interval, or, without a shared cache,
+    once the index is older than its TTL.
+    """
+
+    version_cache_key = "device_image_index_version"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (descriptions, images by id, matches by word), replaced as a whole
+        self._state = None
+        self._built_at = None
+        self._checked_at = None
+        self._version = None
+
+    def match(self, info):
+        parts = info.split("/")
+        words = [part.strip() for part in parts]
+        search_items = [item.split()[0] for item in reversed(words)]
+
+        state = self._get_state()
+        # iterate over words starting from the most important one (first word)
+        for word in search_items:
+            device_image = self._match_word(state, word)
+            if not device_image:
+                continue
+            return device_image
+        return None
+
+    def get(self, image_id):
+        _, images, _ = self._get_state()
+        return images.get(image_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+        if self._shared_cache is not None:
+            try:
+                self._shared_cache.incr(self.version_cache_key)
+            except ValueError:
+                self._shared_cache.set(self.version_cache_key, 1, timeout=None)
+
+    @property
+    def _shared_cache(self):
+        if settings.DEVICE_IMAGE_INDEX_CACHE_ALIAS:
+            return caches[settings.DEVICE_IMAGE_INDEX_CACHE_ALIAS]
+
+    def _match_word(self, state, word):
+        descriptions, _, matches = state
+        key = word.lower()
+        device_image = matches.get(key, _missing)
+        if device_image is not _missing:
+            return device_image
+
+        # Same as `description__icontains=word` ordered by pk
+        device_image = None
+        for description, image in descriptions:
+            if key in description:
+                device_image = image
+                break
+
+        # The words come from the request, so the memo is bounded
+        matches.set(key, device_image)
+        return device_image
+
+    def _is_fresh(self, now):
+        return (
+            self._state is not None
+            and now - self._built_at < settings.DEVICE_IMAGE_INDEX_TTL
+        )
+
+    def _get_state(self):
+        now = time.monotonic()
+        with self._lock:
+            if (
+                self._is_fresh(now)
+                and now - self._checked_at
+                < settings.DEVICE_IMAGE_INDEX_VERSION_CHECK_INTERVAL
+            ):
+                return self._state
+
+        version = None
+        if self._shared_cache is not None:
+            version = self._shared_cache.get(self.version_cache_key)
+
+        with self._lock:
+            if self._is_fresh(now) and self._version == version:
+                self._checked_at = now
+                return self._state
+
+            DeviceImage = get_device_image_model()
+            device_images = list(DeviceImage.objects.order_by("pk"))
+
+            self._state = (
+                [(image.description.lower(), image) for image in device_images],
+                {image.pk: image for image in device_images},
+                LRUCache(
+                    max_size=settings.DEVICE_IMAGE_INDEX_MATCHES_MAX_SIZE,
+                    ttl=settings.DEVICE_IMAGE_INDEX_TTL,
+                ),
+            )
+            self._built_at = self._checked_at = now
+            self._version = version
+
+            return self._state
+
+
+device_image_index = DeviceImageIndex()
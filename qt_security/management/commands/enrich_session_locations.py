@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from qt_utils.model_loaders import get_session_model
+
+from ...enrichment import enrich_sessions
+
+
+class Command(BaseCommand):
+    help = "Resolve the location of sessions that are still pending"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.GEOLOCATION_ENRICHMENT_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **kwargs) -> None:
+        batch_size = kwargs["batch_size"]
+
+        Session = get_session_model()
+        session_ids = list(
+            Session.objects.filter(location_pending=True)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        enriched = 0
+        for start in range(0, len(session_ids), batch_size):
+            end = start + batch_size
+            enriched += enrich_sessions(session_ids[start:end], batch_size=batch_size)
+
+        self.stdout.write(f"Enriched {enriched} of {len(session_ids)} session(s).")
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...revocation import revocation_list
+
+
+class Command(BaseCommand):
+    help = "(Re)load the shared revocation list from the database"
+
+    def handle(self, *args, **kwargs) -> None:
+        if not settings.REVOCATION_CACHE_ALIAS:
+            raise CommandError("REVOCATION_CACHE_ALIAS is not set.")
+
+        if revocation_list.load_shared():
+            self.stdout.write("Loaded the revocation list.")
+        else:
+            self.stdout.write("The revocation list was loaded recently.")
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("qt_security", "0011_alter_session_token"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="session",
+            name="ip_address",
+            field=models.GenericIPAddressField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="session",
+            name="location_pending",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,14 +1,20 @@
-import requests
+import ipaddress
+
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.utils.functional import cached_property
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
-from user_agents import parse
 
 from qt_auth.models import User
 from qt_utils.model_loaders import get_blacklisted_token_model
 from qt_utils.models import AbstractTimeStampModel, QTPublicAssets
 
+from .devices import parse_device_info, resolve_user_agent
+from .enrichment import schedule_session_enrichment
+from .geolocation import get_location_from_ip
+from .indexes import device_image_index
+from .revocation import revocation_list
+
 
 class BlacklistedJWTToken(AbstractTimeStampModel):
     """
@@ -83,32 +89,15 @@ class Device(AbstractTimeStampModel):
 
     @classmethod
     def get_information_from_request(cls, request):
-        info = cls._get_device_info(request.META.get("HTTP_USER_AGENT"))
-        image = cls._get_device_image(info)
-
-        return info, image
+        return resolve_user_agent(request.META.get("HTTP_USER_AGENT"))
 
     @classmethod
     def _get_device_info(cls, user_agent):
-        if not user_agent:
-            return "Other / Other / Other"
-        return str(parse(user_agent))
+        return parse_device_info(user_agent)
 
     @classmethod
     def _get_device_image(cls, info):
-        parts = info.split("/")
-        words = [part.strip() for part in parts]
-        search_items = [item.split()[0] for item in reversed(words)]
-
-        # iterate over words starting from the most important one (first word)
-        for word in search_items:
-            device_image = DeviceImage.objects.filter(
-                Q(description__icontains=word)
-            ).first()
-            if not device_image:
-                continue
-            return device_image
-        return None
+        return device_image_index.match(info)
 
 
 class Session(AbstractTimeStampModel):
@@ -120,34 +109,48 @@ class Session(AbstractTimeStampModel):
     )
     city = models.CharField(max_length=255)
     country = models.CharField(max_length=255)
+    ip_address = models.GenericIPAddressField(blank=True, null=True)
+    # Set when the city & country still have to be resolved for the ip address
+    location_pending = models.BooleanField(default=False)
 
     def __str__(self):
         return f"Session {self.id} for {self.device.info}"
 
-    @property
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if self.location_pending:
+            schedule_session_enrichment(self.pk)
+
+    @cached_property
     def active(self):
-        # check if there is a blacklisted token related to this device token
-        if hasattr(self.token, "blacklistedtoken"):
-            return False
-        return True
+        # check if the token of this session is blacklisted
+        return not revocation_list.is_revoked(self.token.jti)
 
     @classmethod
-    def create_session(cls, device, token, city, country):
-        session = cls.objects.create(
-            device=device,
-            token=token,
-            city=city,
-            country=country,
-        )
+    def create_session(cls, device, token, ip_address, location):
+        session = cls(device=device, token=token)
+        session.update_location(ip_address, location)
+        session.save()
 
         return session
 
     @classmethod
     def get_information_from_request(cls, request):
         ip_address = cls._get_ip_from_request(request)
-        city, country = cls._get_location_from_ip(ip_address)
+        if settings.GEOLOCATION_DEFERRED:
+            # The location is resolved after the session is saved
+            return ip_address, None
+        location = cls._get_location_from_ip(ip_address)
 
-        return city, country
+        return ip_address, location
+
+    def update_location(self, ip_address, location):
+        self.ip_address = ip_address
+        if location is None:
+            self.location_pending = True
+            return
+        self.city, self.country = location
+        self.location_pending = False
 
     @classmethod
     def _get_ip_from_request(cls, request):
@@ -158,18 +161,16 @@ class Session(AbstractTimeStampModel):
             ip = request.META.get("HTTP_X_REAL_IP")
         else:
             ip = request.META.get("REMOTE_ADDR")
-        return ip
+
+        try:
+            return str(ipaddress.ip_address(ip))
+        except ValueError:
+            # Headers can contain anything, only store valid ip addresses
+            return None
 
     @classmethod
     def _get_location_from_ip(cls, ip_address):
-        response = requests.get(
-            f"https://api.ipgeolocation.io/ipgeo?"
-            f"apiKey={settings.GEOLOCATION_API_KEY}&"
-            f"ip={ip_address}"
-        )
-        parsed_response = response.json()
-
-        return parsed_response["city"], parsed_response["country_name"]
+        return get_location_from_ip(ip_address)
 
     def blacklist_token(self):
         BlacklistedToken = get_blacklisted_token_model()
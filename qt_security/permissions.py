@@ -1,3 +1,5 @@
+import time
+
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import BasePermission
@@ -9,10 +11,24 @@ class HasValidSubscription(BasePermission):
     """
 
     def has_permission(self, request, view):
+        token = request.auth
+        if token is not None and "subscribed" in token:
+            # Authorize on the entitlement claims, without touching the database
+            return check_token_has_valid_subscription(token=token)
+
         user = request.user
         return check_user_has_valid_subscription(user=user)
 
 
+def check_token_has_valid_subscription(token):
+    expires_at = token.get("subscription_expires_at")
+    if not token["subscribed"] or (expires_at and expires_at <= time.time()):
+        raise PermissionDenied(
+            _("Your account is not associated with a valid subscription.")
+        )
+    return True
+
+
 def check_user_has_valid_subscription(user):
     if not user.has_valid_subscription():
         raise PermissionDenied(
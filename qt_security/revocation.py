@@ -0,0 +1,176 @@
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from qt_utils.background import BackgroundExecutor
+from qt_utils.model_loaders import get_blacklisted_token_model
+
+load_executor = BackgroundExecutor(
+    "revocation-list",
+    workers_setting="REVOCATION_LOAD_WORKERS",
+    error_message="Failed to load the revocation list",
+)
+
+
+class RevocationList:
+    """
+    The jtis of revoked (blacklisted) refresh tokens, so revocation checks
+    don't have to join the simplejwt blacklist tables.
+
+    Revoked jtis are kept in-process and, when REVOCATION_CACHE_ALIAS is set,
+    in that shared cache, which is (re)loaded from the database by the
+    load_revocation_list command, or in the background once its loaded marker
+    expires. Without a shared cache, or while the marker is missing, unknown
+    jtis are checked with a single database query, since other processes can
+    revoke tokens as well. Entries are evicted once the token has expired
+    (within the hour in the shared cache), as an expired token is rejected
+    anyway.
+
+    The shared cache can evict entries before they expire, which are restored
+    by the next load. The marker expires well before any revoked refresh
+    token does.
+    """
+
+    loaded_cache_key = "revocation_list_loaded"
+    loading_cache_key = "revocation_list_loading"
+    purge_interval = 60  # seconds
+    # Shared entries are stored with their timeout rounded up to this,
+    # so a load takes a set_many per hour instead of a set per token.
+    timeout_granularity = 60 * 60  # seconds
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = {}
+        self._purged_at = time.monotonic()
+        self._load_scheduled = False
+
+    def revoke(self, jti, expires_at):
+        self.revoke_many([(jti, expires_at)])
+
+    def revoke_many(self, tokens):
+        # tokens: iterable of (jti, expires_at) tuples
+        tokens = [(jti, expires_at.timestamp()) for jti, expires_at in tokens]
+        self._add_local(tokens)
+
+        if self._shared_cache is not None:
+            self._add_shared(tokens)
+
+    def is_revoked(self, jti):
+        return jti in self.filter_revoked([jti])
+
+    def filter_revoked(self, jtis):
+        """
+        Returns the revoked jtis of the given jtis
+        """
+        jtis = set(jtis)
+        revoked = {jti for jti in jtis if jti in self._revoked}
+        unknown = jtis - revoked
+        if not unknown:
+            return revoked
+
+        if self._shared_cache is not None and self._is_shared_loaded():
+            found = self._get_shared(unknown)
+        else:
+            found = self._get_from_database(unknown)
+        self._add_local(found)
+
+        return revoked | {jti for jti, _ in found}
+
+    @property
+    def _shared_cache(self):
+        if settings.REVOCATION_CACHE_ALIAS:
+            return caches[settings.REVOCATION_CACHE_ALIAS]
+
+    def _make_shared_key(self, jti):
+        return f"revoked_token:{jti}"
+
+    def _add_local(self, tokens):
+        now = time.time()
+        with self._lock:
+            for jti, expires_at in tokens:
+                self._revoked[jti] = expires_at
+
+            if time.monotonic() - self._purged_at > self.purge_interval:
+                self._revoked = {
+                    jti: expires_at
+                    for jti, expires_at in self._revoked.items()
+                    if expires_at > now
+                }
+                self._purged_at = time.monotonic()
+
+    def _add_shared(self, tokens):
+        now = time.time()
+        entries = defaultdict(dict)
+        for jti, expires_at in tokens:
+            if expires_at > now:
+                timeout = self.timeout_granularity * math.ceil(
+                    (expires_at - now) / self.timeout_granularity
+                )
+                entries[timeout][self._make_shared_key(jti)] = expires_at
+
+        for timeout, timeout_entries in entries.items():
+            self._shared_cache.set_many(timeout_entries, timeout=timeout)
+
+    def _get_shared(self, jtis):
+        keys = {self._make_shared_key(jti): jti for jti in jtis}
+        found = self._shared_cache.get_many(keys.keys())
+        return [(keys[key], expires_at) for key, expires_at in found.items()]
+
+    def _get_from_database(self, jtis):
+        BlacklistedToken = get_blacklisted_token_model()
+        tokens = BlacklistedToken.objects.filter(token__jti__in=jtis).values_list(
+            "token__jti", "token__expires_at"
+        )
+        return [(jti, expires_at.timestamp()) for jti, expires_at in tokens]
+
+    def _is_shared_loaded(self):
+        if self._shared_cache.get(self.loaded_cache_key):
+            return True
+
+        # Loaded in the background, the database is checked meanwhile
+        with self._lock:
+            if self._load_scheduled:
+                return False
+            self._load_scheduled = True
+        load_executor.submit(self._load_shared_in_background)
+        return False
+
+    def _load_shared_in_background(self):
+        try:
+            self.load_shared()
+        finally:
+            with self._lock:
+                self._load_scheduled = False
+
+    def load_shared(self):
+        """
+        (Re)loads the shared cache from the database. Returns whether it was
+        loaded, it's not when another process loaded it less than
+        REVOCATION_RELOAD_INTERVAL ago or is loading it.
+        """
+        # The guard expires by itself, so it also limits how often a cache
+        # that is unable to keep the loaded marker is loaded.
+        if not self._shared_cache.add(
+            self.loading_cache_key, True, timeout=settings.REVOCATION_RELOAD_INTERVAL
+        ):
+            return False
+
+        BlacklistedToken = get_blacklisted_token_model()
+        tokens = BlacklistedToken.objects.filter(
+            token__expires_at__gt=timezone.now()
+        ).values_list("token__jti", "token__expires_at")
+        self._add_shared([(jti, expires_at.timestamp()) for jti, expires_at in tokens])
+        # Evicted entries are restored by the next load, so the marker
+        # is kept for a shorter time than the entries live.
+        self._shared_cache.set(
+            self.loaded_cache_key, True, timeout=settings.REVOCATION_RELOAD_INTERVAL
+        )
+        return True
+
+
+revocation_list = RevocationList()
@@ -27,7 +27,7 @@ class DeviceSerializer(serializers.Serializer):
     id = serializers.CharField()
     image = ImageField()
     info = serializers.CharField()
-    sessions = SessionSerializer(many=True)
+    sessions = SessionSerializer(source="active_sessions", many=True)
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
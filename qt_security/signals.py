@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .devices import user_agent_cache
+from .indexes import device_image_index
+from .models import DeviceImage
+from .revocation import revocation_list
+
+
+@receiver(post_save, sender=DeviceImage)
+@receiver(post_delete, sender=DeviceImage)
+def invalidate_device_image_index(sender, instance, *args, **kwargs):
+    # Rebuild once the change is visible to other connections
+    transaction.on_commit(device_image_index.invalidate)
+    transaction.on_commit(user_agent_cache.clear)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_revocation_list(sender, instance, created, *args, **kwargs):
+    if not created:
+        return
+    jti, expires_at = instance.token.jti, instance.token.expires_at
+    transaction.on_commit(lambda: revocation_list.revoke(jti, expires_at))
@@ -0,0 +1,60 @@
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from qt_security.checkers import (
+    MaximumFileSizeUploadHandler,
+    validate_image_size_and_mime_type,
+)
+
+
+def make_image(size=(64, 64), format="PNG"):
+    image_io = BytesIO()
+    Image.new("RGB", size).save(image_io, format=format)
+    return SimpleUploadedFile("image.png", image_io.getvalue())
+
+
+class ImageValidationTests(SimpleTestCase):
+    """
+    Test validating uploaded images
+    """
+
+    def test_valid_image(self):
+        """
+        Should return the image with the cursor at the start
+        """
+        image = make_image()
+
+        self.assertIs(validate_image_size_and_mime_type(image), image)
+        self.assertEqual(image.tell(), 0)
+
+    def test_invalid_mime_type(self):
+        """
+        Should reject files that are not a supported image
+        """
+        with self.assertRaisesMessage(ValidationError, "Invalid image format"):
+            validate_image_size_and_mime_type(
+                SimpleUploadedFile("image.png", b"%PDF-1.4 not an image")
+            )
+
+    @override_settings(MAXIMUM_IMAGE_DIMENSION=100)
+    def test_image_dimensions(self):
+        """
+        Should reject images that are too large
+        """
+        with self.assertRaisesMessage(ValidationError, "Image dimensions exceed"):
+            validate_image_size_and_mime_type(make_image(size=(101, 1)))
+
+    @override_settings(MAXIMUM_FILE_SIZE=10)
+    def test_upload_handler_rejects_oversized_file(self):
+        """
+        Should reject the upload on the chunk that exceeds the maximum size
+        """
+        handler = MaximumFileSizeUploadHandler()
+
+        self.assertEqual(handler.receive_data_chunk(b"12345", 0), b"12345")
+        with self.assertRaisesMessage(ValidationError, "File size exceeds"):
+            handler.receive_data_chunk(b"678901", 5)
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from qt_security.indexes import DeviceImageIndex, device_image_index
+from qt_utils.model_loaders import get_device_image_model
+
+
+class DeviceImageIndexTests(TestCase):
+    """
+    Test matching device info with a DeviceImage
+    """
+
+    def setUp(self):
+        device_image_index.invalidate()
+        DeviceImage = get_device_image_model()
+        self.apple = DeviceImage.objects.create(description="Apple iPhone iPad Mac")
+        self.chrome = DeviceImage.objects.create(description="Chrome")
+
+    def tearDown(self):
+        device_image_index.invalidate()
+
+    def test_match_most_important_word_first(self):
+        """
+        Should match the device before the browser
+        """
+        info = "iPhone / iOS 16.5 / Mobile Safari 16.5"
+
+        self.assertEqual(device_image_index.match(info), self.apple)
+
+    def test_match_without_queries(self):
+        """
+        Should not query the database once the index is built
+        """
+        device_image_index.match("Other / Windows 10 / Chrome 114.0")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                device_image_index.match("PC / Linux / Chrome 115.0"), self.chrome
+            )
+            self.assertIsNone(device_image_index.match("Other / Other / Other"))
+
+    def test_index_is_rebuilt_after_save(self):
+        """
+        Should match newly added device images
+        """
+        self.assertIsNone(device_image_index.match("PC / Windows 10 / Firefox 115"))
+
+        DeviceImage = get_device_image_model()
+        with self.captureOnCommitCallbacks(execute=True):
+            firefox = DeviceImage.objects.create(description="Firefox")
+
+        self.assertEqual(
+            device_image_index.match("PC / Windows 10 / Firefox 115"), firefox
+        )
+
+    @override_settings(DEVICE_IMAGE_INDEX_MATCHES_MAX_SIZE=2)
+    def test_matches_are_bounded(self):
+        """
+        Should not remember more matched words than the maximum size
+        """
+        device_image_index.invalidate()
+        for version in range(5):
+            device_image_index.match(f"PC / Linux / Browser{version} 1.0")
+
+        _, _, matches = device_image_index._get_state()
+        self.assertEqual(len(matches), 2)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        DEVICE_IMAGE_INDEX_CACHE_ALIAS="default",
+    )
+    def test_version_is_checked_once_per_interval(self):
+        """
+        Should not read the shared version on every match
+        """
+        device_image_index.match("PC / Linux / Chrome 115.0")
+
+        with mock.patch.object(
+            DeviceImageIndex, "_shared_cache", new_callable=mock.PropertyMock
+        ) as shared_cache:
+            device_image_index.match("PC / Linux / Chrome 115.0")
+
+        shared_cache.assert_not_called()
@@ -118,3 +118,30 @@ class DevicesAPITests(APITestCase):
 
     def _get_url(self):
         return reverse("devices")
+
+    def test_get_devices_queries(self):
+        """
+        Should not query per session
+        """
+        user = UserFactory()
+        tokens = [get_refresh_token_for_user(user) for _ in range(8)]
+        user.blacklist_token(tokens[0])
+        header = make_authentication_headers_auth_token(user)
+        url = (
+            self._get_url()
+            + "?"
+            + urllib.parse.urlencode({"refresh_token": tokens[-1]})
+        )
+
+        # The user, the refresh token, the devices, their sessions and the
+        # revocations of their tokens
+        with self.assertNumQueries(5):
+            response = self.client.get(url, **header, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The 7 unrevoked sessions and the one of the authentication headers
+        sessions = [
+            session for device in response.data for session in device["sessions"]
+        ]
+        self.assertEqual(len(sessions), 8)
+        self.assertTrue(all(session["active"] for session in sessions))
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from qt_auth.factories import UserFactory
+from qt_billing.subscriptions import set_cached_subscription_status
+from qt_security.authentication import active_user_cache
+from qt_utils.model_loaders import get_stripe_customer_model, get_user_model
+
+
+@override_settings(JWT_ENTITLEMENT_CLAIMS=True)
+class EntitlementClaimsTests(APITestCase):
+    """
+    Test authorizing requests on the entitlement claims of access tokens
+    """
+
+    def setUp(self):
+        cache.clear()
+        active_user_cache.clear()
+        Customer = get_stripe_customer_model()
+        customer = Customer.objects.create(id="cus_test", livemode=False)
+        self.user = UserFactory(
+            customer=customer, status=get_user_model().STATUS_TYPE_VERIFIED
+        )
+
+    def test_access_token_contains_claims(self):
+        """
+        Should add the status & subscription to the access token
+        """
+        token = AccessToken(self.user.get_jwt_token()["access"])
+
+        self.assertEqual(token["status"], get_user_model().STATUS_TYPE_VERIFIED)
+        self.assertEqual(token["subscribed"], False)
+        self.assertIsNone(token["subscription_expires_at"])
+
+    def test_unsubscribed_without_queries(self):
+        """
+        Should return 403 without loading the user
+        """
+        token = self.user.get_jwt_token()
+        header = {"HTTP_AUTHORIZATION": f"Bearer {token['access']}"}
+        active_user_cache.set(self.user.pk, True)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("authenticated-user"), **header)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.data["detail"],
+            _("Your account is not associated with a valid subscription."),
+        )
+
+    def test_inactive_user(self):
+        """
+        Should return 401 once the user is deactivated
+        """
+        token = self.user.get_jwt_token()
+        header = {"HTTP_AUTHORIZATION": f"Bearer {token['access']}"}
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("authenticated-user"), **header)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data["code"], "user_inactive")
+
+    @override_settings(JWT_ENTITLEMENT_CLAIMS=False, SUBSCRIPTION_CACHE_ALIAS="default")
+    def test_cached_status_without_claims(self):
+        """
+        Should load the user with its customer, for the cached status
+        """
+        token = self.user.get_jwt_token()
+        header = {"HTTP_AUTHORIZATION": f"Bearer {token['access']}"}
+        set_cached_subscription_status("cus_test", None)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("authenticated-user"), **header)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,156 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from qt_security.geolocation import (
+    UNKNOWN_LOCATION,
+    BaseGeolocationBackend,
+    GeoIPDatabaseBackend,
+    get_geolocation_backends,
+    get_location_from_ip,
+    location_cache,
+)
+
+
+class UnresolvableBackend(BaseGeolocationBackend):
+    def get_location(self, ip_address):
+        return None
+
+
+class AmsterdamBackend(BaseGeolocationBackend):
+    def get_location(self, ip_address):
+        return "Amsterdam", "Netherlands"
+
+
+@override_settings(
+    GEOLOCATION_BACKENDS=[
+        "qt_security.tests.test_geolocation.UnresolvableBackend",
+        "qt_security.tests.test_geolocation.AmsterdamBackend",
+    ]
+)
+class GeolocationTests(SimpleTestCase):
+    """
+    Test resolving a location for an IP address
+    """
+
+    def setUp(self):
+        get_geolocation_backends.cache_clear()
+        location_cache.clear()
+
+    def tearDown(self):
+        get_geolocation_backends.cache_clear()
+
+    def test_location_falls_back_to_next_backend(self):
+        """
+        Should return the location of the first backend that resolves the IP
+        """
+        self.assertEqual(get_location_from_ip("8.8.8.8"), ("Amsterdam", "Netherlands"))
+
+    def test_location_is_cached(self):
+        """
+        Should only ask the backends once for the same IP
+        """
+        get_location_from_ip("8.8.4.4")
+        misses = location_cache.local.misses
+
+        self.assertEqual(get_location_from_ip("8.8.4.4"), ("Amsterdam", "Netherlands"))
+        self.assertEqual(location_cache.local.misses, misses)
+
+    def test_location_for_private_ip(self):
+        """
+        Should return an unknown location without asking the backends
+        """
+        self.assertEqual(get_location_from_ip("127.0.0.1"), UNKNOWN_LOCATION)
+        self.assertEqual(get_location_from_ip("192.168.1.1"), UNKNOWN_LOCATION)
+
+    def test_location_for_invalid_ip(self):
+        """
+        Should return an unknown location
+        """
+        self.assertEqual(get_location_from_ip(None), UNKNOWN_LOCATION)
+        self.assertEqual(get_location_from_ip("not-an-ip"), UNKNOWN_LOCATION)
+
+
+@override_settings(GEOIP_DATABASE_PATH="/data/GeoLite2-City.mmdb")
+class GeoIPDatabaseBackendTests(SimpleTestCase):
+    """
+    Test looking up IP addresses in the local MaxMind database
+    """
+
+    def setUp(self):
+        self.open_patcher = mock.patch("maxminddb.open_database")
+        self.open_database = self.open_patcher.start()
+        self.reader = self.open_database.return_value
+
+    def tearDown(self):
+        self.open_patcher.stop()
+
+    def test_location_from_record(self):
+        """
+        Should return the English city and country names of the record
+        """
+        self.reader.get.return_value = {
+            "city": {"names": {"en": "Amsterdam", "nl": "Amsterdam"}},
+            "country": {"names": {"en": "Netherlands", "nl": "Nederland"}},
+        }
+
+        location = GeoIPDatabaseBackend().get_location("8.8.8.8")
+
+        self.assertEqual(location, ("Amsterdam", "Netherlands"))
+        self.reader.get.assert_called_once_with("8.8.8.8")
+
+    def test_location_without_city(self):
+        """
+        Should return an empty city for a record of a country only
+        """
+        self.reader.get.return_value = {"country": {"names": {"en": "Netherlands"}}}
+
+        location = GeoIPDatabaseBackend().get_location("8.8.8.8")
+
+        self.assertEqual(location, ("", "Netherlands"))
+
+    def test_location_without_record(self):
+        """
+        Should not resolve an IP address that isn't in the database
+        """
+        self.reader.get.return_value = None
+
+        self.assertIsNone(GeoIPDatabaseBackend().get_location("8.8.8.8"))
+
+    def test_location_of_unsupported_ip(self):
+        """
+        Should not resolve an IP address the database fails to look up
+        """
+        self.reader.get.side_effect = ValueError("IPv6 address in an IPv4 database")
+
+        self.assertIsNone(GeoIPDatabaseBackend().get_location("2001:4860::8888"))
+
+    def test_database_fails_to_open(self):
+        """
+        Should disable the backend instead of failing every lookup
+        """
+        self.open_database.side_effect = FileNotFoundError("GeoLite2-City.mmdb")
+
+        with self.assertLogs("qt_security.geolocation", "ERROR"):
+            backend = GeoIPDatabaseBackend()
+
+        self.assertIsNone(backend.get_location("8.8.8.8"))
+
+    @override_settings(
+        GEOLOCATION_BACKENDS=[
+            "qt_security.geolocation.GeoIPDatabaseBackend",
+            "qt_security.tests.test_geolocation.AmsterdamBackend",
+        ]
+    )
+    def test_location_falls_back_on_lookup_error(self):
+        """
+        Should ask the next backend when the database fails to look up the IP
+        """
+        get_geolocation_backends.cache_clear()
+        location_cache.clear()
+        self.addCleanup(get_geolocation_backends.cache_clear)
+        self.reader.get.side_effect = ValueError("IPv6 address in an IPv4 database")
+
+        self.assertEqual(
+            get_location_from_ip("2001:4860::8888"), ("Amsterdam", "Netherlands")
+        )
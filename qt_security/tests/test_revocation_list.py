@@ -0,0 +1,136 @@
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from qt_auth.factories import UserFactory
+from qt_security.revocation import RevocationList, load_executor
+from qt_utils.model_loaders import get_blacklisted_token_model
+
+
+class RevocationListTests(TestCase):
+    """
+    Test checking if refresh tokens are revoked
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.revocation_list = RevocationList()
+        user = UserFactory()
+        for _ in range(2):
+            user.get_jwt_token()
+        self.revoked_token, self.token = user.outstandingtoken_set.all()
+
+        BlacklistedToken = get_blacklisted_token_model()
+        BlacklistedToken.objects.create(token=self.revoked_token)
+
+    def test_revoked_token_without_queries(self):
+        """
+        Should know about revoked tokens without the database
+        """
+        self.revocation_list.revoke(self.token.jti, self.token.expires_at)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.revocation_list.is_revoked(self.token.jti))
+
+    def test_unknown_tokens_are_checked_in_the_database(self):
+        """
+        Should check unknown tokens with a single query
+        """
+        with self.assertNumQueries(1):
+            revoked = self.revocation_list.filter_revoked(
+                [self.revoked_token.jti, self.token.jti]
+            )
+
+        self.assertEqual(revoked, {self.revoked_token.jti})
+
+    @override_settings(REVOCATION_CACHE_ALIAS="default")
+    def test_shared_cache_is_loaded_once(self):
+        """
+        Should load the shared cache once and then trust it
+        """
+        with self.assertNumQueries(1):
+            self.assertTrue(self.revocation_list.load_shared())
+
+        with self.assertNumQueries(0):
+            self.assertFalse(RevocationList().is_revoked(self.token.jti))
+            self.assertTrue(RevocationList().is_revoked(self.revoked_token.jti))
+
+    @override_settings(REVOCATION_CACHE_ALIAS="default")
+    def test_shared_cache_is_loaded_by_one_process(self):
+        """
+        Should not load the shared cache while it was loaded recently
+        """
+        self.assertTrue(self.revocation_list.load_shared())
+        cache.delete(self.revocation_list.loaded_cache_key)
+
+        with self.assertNumQueries(0):
+            self.assertFalse(RevocationList().load_shared())
+
+    @override_settings(REVOCATION_CACHE_ALIAS="default")
+    def test_shared_cache_is_loaded_in_bulk(self):
+        """
+        Should store the revoked tokens with a single set_many
+        """
+        BlacklistedToken = get_blacklisted_token_model()
+        BlacklistedToken.objects.create(token=self.token)
+
+        with mock.patch.object(cache, "set_many") as set_many:
+            self.revocation_list.load_shared()
+
+        self.assertEqual(set_many.call_count, 1)
+        self.assertEqual(len(set_many.call_args.args[0]), 2)
+
+    @override_settings(REVOCATION_CACHE_ALIAS="default")
+    def test_shared_cache_is_not_loaded_by_requests(self):
+        """
+        Should check the database and load the shared cache in the background
+        """
+        with mock.patch.object(load_executor, "submit") as submit:
+            with self.assertNumQueries(1):
+                self.assertTrue(self.revocation_list.is_revoked(self.revoked_token.jti))
+            self.revocation_list.is_revoked(self.token.jti)
+
+        submit.assert_called_once_with(self.revocation_list._load_shared_in_background)
+
+    @override_settings(REVOCATION_CACHE_ALIAS="default")
+    def test_evicted_entries_are_reloaded(self):
+        """
+        Should restore revoked tokens evicted from the shared cache
+        """
+        self.revocation_list.load_shared()
+
+        # Evicted entries stay unknown until the loaded marker expires
+        cache.delete(self.revocation_list._make_shared_key(self.revoked_token.jti))
+        cache.delete(self.revocation_list.loaded_cache_key)
+        cache.delete(self.revocation_list.loading_cache_key)
+
+        self.assertTrue(self.revocation_list.load_shared())
+        with self.assertNumQueries(0):
+            self.assertTrue(RevocationList().is_revoked(self.revoked_token.jti))
+
+    @override_settings(REVOCATION_CACHE_ALIAS="default", REVOCATION_RELOAD_INTERVAL=60)
+    def test_loaded_marker_expires(self):
+        """
+        Should not keep the loaded marker forever
+        """
+        self.revocation_list.load_shared()
+
+        self.assertLessEqual(
+            cache._expire_info[cache.make_key(self.revocation_list.loaded_cache_key)],
+            time.time() + 60,
+        )
+
+    @override_settings(REVOCATION_CACHE_ALIAS="default")
+    def test_load_revocation_list_command(self):
+        """
+        Should load the shared cache
+        """
+        out = StringIO()
+        call_command("load_revocation_list", stdout=out)
+
+        self.assertIn("Loaded", out.getvalue())
+        self.assertTrue(cache.get(self.revocation_list.loaded_cache_key))
@@ -0,0 +1,73 @@
+from django.test import TestCase, override_settings
+
+from qt_auth.factories import UserFactory
+from qt_security import enrichment
+from qt_security.enrichment import enrich_sessions
+from qt_security.factories import DeviceFactory, SessionFactory
+from qt_security.geolocation import get_geolocation_backends, location_cache
+from qt_utils.model_loaders import get_outstanding_token_model
+
+
+@override_settings(
+    GEOLOCATION_BACKENDS=["qt_security.tests.test_geolocation.AmsterdamBackend"],
+    GEOLOCATION_ENRICHMENT_RETRIES=0,
+)
+class SessionEnrichmentTests(TestCase):
+    """
+    Test resolving the location of pending sessions
+    """
+
+    def setUp(self):
+        get_geolocation_backends.cache_clear()
+        location_cache.clear()
+
+    def tearDown(self):
+        get_geolocation_backends.cache_clear()
+
+    def test_enrich_pending_sessions(self):
+        """
+        Should resolve the location and clear the pending flag
+        """
+        pending_session = self._create_session(
+            ip_address="8.8.8.8", location_pending=True, city="", country=""
+        )
+        resolved_session = self._create_session(
+            ip_address="8.8.8.8", location_pending=False, city="Utrecht"
+        )
+
+        self.assertEqual(enrich_sessions(), 1)
+
+        pending_session.refresh_from_db()
+        resolved_session.refresh_from_db()
+        self.assertFalse(pending_session.location_pending)
+        self.assertEqual(pending_session.city, "Amsterdam")
+        self.assertEqual(pending_session.country, "Netherlands")
+        self.assertEqual(resolved_session.city, "Utrecht")
+
+    @override_settings(GEOLOCATION_ENRICHMENT_BATCH_SIZE=1)
+    def test_drain_enriches_all_queued_sessions(self):
+        """
+        Should enrich every queued session, also beyond a single batch
+        """
+        sessions = [
+            self._create_session(
+                ip_address="8.8.8.8", location_pending=True, city="", country=""
+            )
+            for _ in range(3)
+        ]
+        enrichment._queue.update(session.pk for session in sessions)
+
+        enrichment._drain()
+
+        for session in sessions:
+            session.refresh_from_db()
+            self.assertFalse(session.location_pending)
+            self.assertEqual(session.city, "Amsterdam")
+
+    def _create_session(self, **kwargs):
+        user = UserFactory()
+        token = user.get_jwt_token()
+        OutstandingToken = get_outstanding_token_model()
+        outstanding_token = OutstandingToken.objects.get(token=token["refresh"])
+        device = DeviceFactory(user=user)
+        return SessionFactory(device=device, token=outstanding_token, **kwargs)
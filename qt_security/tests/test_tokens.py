@@ -0,0 +1,119 @@
+import jwt
+from django.db.models.query import EmptyQuerySet
+from django.forms.models import model_to_dict
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from qt_auth.factories import UserFactory
+from qt_auth.validators import outstanding_token_exists
+from qt_security.tokens import (
+    OutstandingRefreshToken,
+    filter_outstanding_tokens,
+    get_outstanding_token,
+)
+from qt_security.validators import refresh_token_exists
+from qt_utils.model_loaders import (
+    get_blacklisted_token_model,
+    get_outstanding_token_model,
+)
+
+
+class OutstandingRefreshTokenTests(TestCase):
+    """
+    Test creating refresh tokens that keep their OutstandingToken
+    """
+
+    def test_outstanding_token_matches_simplejwt(self):
+        """
+        Should create the same OutstandingToken as simplejwt's BlacklistMixin
+        """
+        user = UserFactory()
+        OutstandingToken = get_outstanding_token_model()
+
+        token = RefreshToken.for_user(user)
+        expected = OutstandingToken.objects.get(jti=token["jti"])
+
+        with self.assertNumQueries(1):
+            token = OutstandingRefreshToken.for_user(user)
+
+        self.assertEqual(
+            OutstandingToken.objects.get(jti=token["jti"]), token.outstanding_token
+        )
+        fields = set(model_to_dict(expected)) - {"id"}
+        for field in fields:
+            self.assertIsNotNone(getattr(token.outstanding_token, field), field)
+        self.assertEqual(
+            {field: type(getattr(expected, field)) for field in fields},
+            {field: type(getattr(token.outstanding_token, field)) for field in fields},
+        )
+        self.assertEqual(token.outstanding_token.token, str(token))
+        self.assertEqual(token.outstanding_token.user, user)
+
+
+class OutstandingTokenLookupTests(TestCase):
+    """
+    Test finding the OutstandingToken of a refresh token by its jti
+    """
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.token = self.user.get_jwt_token()["refresh"]
+
+    def test_lookup_by_jti(self):
+        """
+        Should find the OutstandingToken of the token
+        """
+        outstanding_token = get_outstanding_token(self.token)
+
+        self.assertEqual(outstanding_token.token, self.token)
+        self.assertIn('"jti" =', str(filter_outstanding_tokens(self.token).query))
+
+    def test_lookup_of_token_with_same_jti(self):
+        """
+        Should not match another token that carries the same jti
+        """
+        payload = jwt.decode(self.token, options={"verify_signature": False})
+        forged_token = jwt.encode(
+            {**payload, "user_id": payload["user_id"] + 1},
+            "another-secret-key-that-is-long-enough",
+        )
+
+        self.assertFalse(filter_outstanding_tokens(forged_token).exists())
+
+    def test_lookup_of_undecodable_token(self):
+        """
+        Should not find anything, without querying
+        """
+        for token in (
+            "not-a-token",
+            jwt.encode({"user_id": 1}, "another-secret-key-that-is-long-enough"),
+        ):
+            with self.assertNumQueries(0):
+                tokens = filter_outstanding_tokens(token)
+                self.assertIsInstance(tokens, EmptyQuerySet)
+                self.assertFalse(tokens.exists())
+
+    def test_validators(self):
+        """
+        Should only accept tokens that are outstanding
+        """
+        for validator in (refresh_token_exists, outstanding_token_exists):
+            validator(self.token)
+            with self.assertRaises(ValidationError):
+                validator("not-a-token")
+
+    def test_blacklist_token(self):
+        """
+        Should blacklist the OutstandingToken of the token
+        """
+        self.user.blacklist_token(self.token)
+
+        BlacklistedToken = get_blacklisted_token_model()
+        self.assertTrue(
+            BlacklistedToken.objects.filter(token__token=self.token).exists()
+        )
+
+        OutstandingToken = get_outstanding_token_model()
+        with self.assertRaises(OutstandingToken.DoesNotExist):
+            self.user.blacklist_token("not-a-token")
@@ -0,0 +1,57 @@
+from django.test import TestCase
+
+from qt_security.devices import (
+    DEFAULT_DEVICE_INFO,
+    resolve_user_agent,
+    user_agent_cache,
+)
+from qt_security.indexes import device_image_index
+from qt_utils.model_loaders import get_device_image_model
+
+USER_AGENT = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/16.5 Mobile/15E148 Safari/604.1"
+)
+
+
+class UserAgentResolverTests(TestCase):
+    """
+    Test resolving the device info & image for a user agent
+    """
+
+    def setUp(self):
+        device_image_index.invalidate()
+        user_agent_cache.clear()
+        DeviceImage = get_device_image_model()
+        self.apple = DeviceImage.objects.create(description="Apple iPhone iPad Mac")
+
+    def tearDown(self):
+        device_image_index.invalidate()
+        user_agent_cache.clear()
+
+    def test_resolve_user_agent(self):
+        """
+        Should return the parsed device info and matching image
+        """
+        info, image = resolve_user_agent(USER_AGENT)
+
+        self.assertEqual(info, "iPhone / iOS 16.5 / Mobile Safari 16.5")
+        self.assertEqual(image, self.apple)
+
+    def test_resolve_user_agent_once(self):
+        """
+        Should parse a user agent only once and not query the database again
+        """
+        resolve_user_agent(USER_AGENT)
+
+        with self.assertNumQueries(0):
+            info, image = resolve_user_agent(USER_AGENT)
+
+        self.assertEqual(image, self.apple)
+        self.assertEqual(user_agent_cache.stats()["hits"], 1)
+
+    def test_resolve_without_user_agent(self):
+        """
+        Should return the default device info
+        """
+        self.assertEqual(resolve_user_agent(None), (DEFAULT_DEVICE_INFO, None))
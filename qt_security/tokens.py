@@ -0,0 +1,65 @@
+import jwt
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from qt_utils.model_loaders import get_outstanding_token_model
+
+from .revocation import revocation_list
+
+
+def get_jti_for_token(token):
+    # The signature is not verified here, the jti is only used to find the
+    # (indexed) OutstandingToken which is then compared with the full token.
+    try:
+        payload = jwt.decode(token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return None
+    return payload.get(api_settings.JTI_CLAIM)
+
+
+def filter_outstanding_tokens(token):
+    OutstandingToken = get_outstanding_token_model()
+    jti = get_jti_for_token(token)
+    if not jti:
+        return OutstandingToken.objects.none()
+    return OutstandingToken.objects.filter(jti=jti, token=token)
+
+
+def get_outstanding_token(token):
+    return filter_outstanding_tokens(token).get()
+
+
+class OutstandingRefreshToken(RefreshToken):
+    """
+    RefreshToken that keeps the OutstandingToken it creates for a user,
+    so it doesn't have to be queried again right after creating it,
+    and checks the revocation list instead of the blacklist tables.
+    """
+
+    outstanding_token = None
+
+    def check_blacklist(self):
+        if revocation_list.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    @classmethod
+    def for_user(cls, user):
+        # BlacklistMixin.for_user is skipped as it creates the OutstandingToken
+        # without returning it, the OutstandingToken is created below with the
+        # same fields as simplejwt 5.2 does instead. Pinned by
+        # `test_outstanding_token_matches_simplejwt` for simplejwt upgrades.
+        token = super(BlacklistMixin, cls).for_user(user)
+
+        OutstandingToken = get_outstanding_token_model()
+        token.outstanding_token = OutstandingToken.objects.create(
+            user=user,
+            jti=token[api_settings.JTI_CLAIM],
+            token=str(token),
+            created_at=token.current_time,
+            expires_at=datetime_from_epoch(token["exp"]),
+        )
+
+        return token
@@ -1,7 +1,9 @@
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import ValidationError
 
-from qt_utils.model_loaders import get_outstanding_token_model, get_session_model
+from qt_utils.model_loaders import get_session_model
+
+from .tokens import filter_outstanding_tokens
 
 
 def session_id_exists(session_id):
@@ -13,8 +15,7 @@ def session_id_exists(session_id):
 
 
 def refresh_token_exists(refresh_token):
-    OutstandingToken = get_outstanding_token_model()
-    if not OutstandingToken.objects.filter(token=refresh_token).exists():
+    if not filter_outstanding_tokens(refresh_token).exists():
         raise ValidationError(
             _("Token not found."),
         )
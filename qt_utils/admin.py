@@ -1,6 +1,11 @@
 from django.contrib import admin
 
-from .models import NewsletterSubscriber
+from .models import (
+    NewsletterDispatch,
+    NewsletterSubscriber,
+    OutgoingEmail,
+    StorageDeletion,
+)
 
 
 class NewsletterSubscriberAdmin(admin.ModelAdmin):
@@ -15,3 +20,45 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
 
 
 admin.site.register(NewsletterSubscriber, NewsletterSubscriberAdmin)
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "to", "status", "attempts", "created_at")
+    list_filter = ("status",)
+    search_fields = ("to",)
+    readonly_fields = ("attempts", "sent_at", "last_error")
+
+    class Meta:
+        model = OutgoingEmail
+
+
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
+
+
+class NewsletterDispatchAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "sent_count", "failed_count", "created_at")
+    readonly_fields = (
+        "status",
+        "last_subscriber_id",
+        "sent_count",
+        "failed_count",
+        "failed_subscriber_ids",
+        "completed_at",
+    )
+
+    class Meta:
+        model = NewsletterDispatch
+
+
+admin.site.register(NewsletterDispatch, NewsletterDispatchAdmin)
+
+
+class StorageDeletionAdmin(admin.ModelAdmin):
+    list_display = ("bucket_name", "prefix", "attempts", "completed_at", "created_at")
+    readonly_fields = ("attempts", "last_error", "completed_at")
+
+    class Meta:
+        model = StorageDeletion
+
+
+admin.site.register(StorageDeletion, StorageDeletionAdmin)
@@ -5,3 +5,7 @@ class QtUtilsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "qt_utils"
     verbose_name = "Utils"
+
+    def ready(self):
+        # import checks in order to register them
+        import qt_utils.checks  # noqa
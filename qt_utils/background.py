@@ -0,0 +1,50 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundExecutor:
+    """
+    A thread pool, created on first use, that runs work off the request thread.
+    As nobody waits for the result, failures are logged with `error_message`.
+    """
+
+    def __init__(self, name, workers_setting, error_message):
+        self.name = name
+        self.workers_setting = workers_setting
+        self.error_message = error_message
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, self.workers_setting),
+                    thread_name_prefix=self.name,
+                )
+            return self._executor
+
+    def submit(self, func, *args):
+        return self.executor.submit(self._run, func, *args)
+
+    def submit_on_commit(self, func, *args):
+        # Only submitted once the transaction is committed,
+        # otherwise the worker thread is unable to see the rows.
+        transaction.on_commit(lambda: self.submit(func, *args))
+
+    def _run(self, func, *args):
+        try:
+            return func(*args)
+        except Exception:
+            logger.exception("%s %r", self.error_message, args)
+            raise
+        finally:
+            # Worker threads have their own database connections
+            connections.close_all()
@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+_missing = object()
+
+# Backends that keep their entries within a single process
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+
+def is_shared_cache(alias):
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+class LRUCache:
+    """
+    A thread-safe, size bounded in-process cache.
+    Entries expire after `ttl` seconds and the least recently used
+    entry is evicted once the cache is full.
+    """
+
+    def __init__(self, max_size, ttl, timer=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _missing)
+            if entry is not _missing:
+                value, expires_at = entry
+                if expires_at > self.timer():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        expires_at = self.timer() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+class TieredCache:
+    """
+    An in-process LRUCache in front of an (optional) Django cache,
+    so results can be shared between all worker processes.
+    Shared entries carry their (wall clock) expiry time, so an entry promoted
+    to the in-process tier never outlives the shared one.
+    """
+
+    def __init__(self, prefix, max_size, ttl, alias=None, clock=time.time):
+        self.prefix = prefix
+        self.ttl = ttl
+        self.alias = alias
+        self.clock = clock
+        self.local = LRUCache(max_size=max_size, ttl=ttl)
+        self.shared_hits = 0
+
+    @property
+    def shared(self):
+        if self.alias:
+            return caches[self.alias]
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _missing)
+        if value is not _missing:
+            return value
+
+        if self.shared is not None:
+            entry = self.shared.get(self._make_shared_key(key))
+            if entry is not None:
+                value, expires_at = entry
+                ttl_left = min(expires_at - self.clock(), self.ttl)
+                if ttl_left > 0:
+                    self.shared_hits += 1
+                    self.local.set(key, value, ttl=ttl_left)
+                    return value
+
+        return default
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self.local.set(key, value, ttl=ttl)
+        if self.shared is not None:
+            self.shared.set(
+                self._make_shared_key(key),
+                (value, self.clock() + ttl),
+                timeout=ttl,
+            )
+
+    def delete(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(self._make_shared_key(key))
+
+    def clear(self):
+        # Only clears the in-process tier, shared entries expire by their TTL
+        self.local.clear()
+
+    def stats(self):
+        return {
+            "local_hits": self.local.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.local.misses - self.shared_hits,
+            "size": len(self.local),
+        }
+
+    def _make_shared_key(self, key):
+        return f"{self.prefix}:{key}"
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from .cache import is_shared_cache
+
+# Caches that are updated (e.g. by webhooks) in a single process, or that
+# only pay off when reused across processes, so they have to be shared.
+SHARED_CACHE_ALIAS_SETTINGS = [
+    "SUBSCRIPTION_CACHE_ALIAS",
+    "CHECKOUT_SESSION_CACHE_ALIAS",
+    "BILLING_PORTAL_CACHE_ALIAS",
+]
+
+
+@register(Tags.caches)
+def check_shared_cache_aliases(app_configs, **kwargs):
+    errors = []
+    for setting in SHARED_CACHE_ALIAS_SETTINGS:
+        alias = getattr(settings, setting)
+        if not alias:
+            continue
+        if alias not in settings.CACHES:
+            errors.append(
+                Error(f"{setting} refers to the unknown cache {alias!r}.", id="qt.E001")
+            )
+        elif not is_shared_cache(alias):
+            errors.append(
+                Error(
+                    f"{setting} refers to the cache {alias!r}, "
+                    "which is not shared between processes.",
+                    hint="Use a shared backend such as Redis or Memcached.",
+                    id="qt.E002",
+                )
+            )
+    return errors
+
+
+@register()
+def check_default_profile_image(app_configs, **kwargs):
+    # A warning, as local setups don't need (public) assets
+    if settings.DEFAULT_PROFILE_IMAGE_URL or (
+        settings.AWS_S3_PUBLIC_ASSETS and settings.AWS_DEFAULT_REGION
+    ):
+        return []
+    return [
+        Warning(
+            "Users without an uploaded profile image have no image.",
+            hint=(
+                "Set DEFAULT_PROFILE_IMAGE_URL, or AWS_S3_PUBLIC_ASSETS and "
+                "AWS_DEFAULT_REGION."
+            ),
+            id="qt.W001",
+        )
+    ]
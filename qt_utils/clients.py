@@ -0,0 +1,56 @@
+import threading
+
+from django.conf import settings
+
+
+class LazyClient:
+    """
+    Creates a client on first use and reuses it for the rest of the process,
+    so importing a module doesn't pay for setting up (e.g. boto3) clients.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._client = None
+
+    def __call__(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self.factory()
+        return self._client
+
+    @property
+    def is_created(self):
+        return self._client is not None
+
+    def reset(self):
+        with self._lock:
+            self._client = None
+
+
+@LazyClient
+def get_s3_client():
+    import boto3
+
+    # Clients (unlike resources) are thread-safe, so one is shared per process
+    return boto3.client(
+        "s3",
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    )
+
+
+@LazyClient
+def get_stripe():
+    import stripe
+
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    # Keeps a persistent (keep-alive) session per thread, retried requests
+    # are safe as creating objects is done with idempotency keys.
+    stripe.default_http_client = stripe.http_client.RequestsClient(
+        timeout=settings.STRIPE_HTTP_TIMEOUT
+    )
+    stripe.max_network_retries = settings.STRIPE_MAX_NETWORK_RETRIES
+    return stripe
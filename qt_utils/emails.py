@@ -0,0 +1,103 @@
+import threading
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.template.loader import select_template
+from django.utils import translation
+
+from .model_loaders import get_outgoing_email_model
+
+
+class EmailComposer:
+    """
+    Renders the subject, text and html part of an email from a single context.
+
+    The compiled templates are kept per language, a language specific template
+    (e.g. `verify_email.nl.html`) is used when it exists, otherwise the
+    default one (`verify_email.html`).
+    """
+
+    def __init__(self, template_name, subject):
+        self.template_name = template_name
+        self.subject = subject
+        self._lock = threading.Lock()
+        self._templates = {}
+
+    def get_templates(self, language=None):
+        language = language or translation.get_language() or settings.LANGUAGE_CODE
+        try:
+            return self._templates[language]
+        except KeyError:
+            pass
+
+        templates = tuple(
+            select_template(
+                [
+                    f"{self.template_name}.{language}.{extension}",
+                    f"{self.template_name}.{extension}",
+                ]
+            )
+            for extension in ("txt", "html")
+        )
+        with self._lock:
+            self._templates[language] = templates
+        return templates
+
+    def render(self, context):
+        text_template, html_template = self.get_templates()
+        return (
+            str(self.subject),
+            text_template.render(context),
+            html_template.render(context),
+        )
+
+    def render_many(self, contexts, language=None):
+        """
+        Renders an email for each of the contexts, in a single language
+        so the templates are only looked up once.
+        Returns a list, so the language is only active while rendering.
+        """
+        with translation.override(language or translation.get_language()):
+            text_template, html_template = self.get_templates()
+            subject = str(self.subject)
+            return [
+                (
+                    subject,
+                    text_template.render(context),
+                    html_template.render(context),
+                )
+                for context in contexts
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._templates = {}
+
+
+def send_outgoing_emails(batch_size):
+    """
+    Sends a batch of queued emails over a single mail connection.
+    The emails are claimed first, so other workers skip them, and each email
+    is marked as sent right after it's sent, outside of a transaction.
+    Returns the number of emails that were processed.
+    """
+    OutgoingEmail = get_outgoing_email_model()
+
+    emails = OutgoingEmail.claim_sendable(batch_size)
+    if not emails:
+        return 0
+
+    connection = get_connection()
+    connection.open()
+    try:
+        for email in emails:
+            try:
+                email.to_email_message(connection=connection).send()
+            except Exception as err:
+                email.mark_failed(err)
+            else:
+                email.mark_sent()
+    finally:
+        connection.close()
+
+    return len(emails)
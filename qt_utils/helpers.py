@@ -1,15 +1,4 @@
-from io import BytesIO
-
-import boto3
 from django.conf import settings
-from django.core.files import File
-from PIL import Image
-
-s3 = boto3.client(
-    "s3",
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-)
 
 
 def aws_instance_directory_path(instance, _):
@@ -17,12 +6,15 @@ def aws_instance_directory_path(instance, _):
     return "user_{0}/{1}".format(instance.email, "profile_image.png")
 
 
-def get_s3_image(bucket_name, key):
-    response = s3.get_object(Bucket=bucket_name, Key=key)
-    image_data = response["Body"].read()
-    image = Image.open(BytesIO(image_data))
+def get_default_profile_image_url():
+    # Built on use, missing settings are reported by the qt.W001 system check
+    if settings.DEFAULT_PROFILE_IMAGE_URL:
+        return settings.DEFAULT_PROFILE_IMAGE_URL
 
-    # Save the PIL Image to a BytesIO object
-    img_io = BytesIO()
-    image.save(img_io, format=image.format)
-    return File(img_io, name="profile_image.png")
+    if not settings.AWS_S3_PUBLIC_ASSETS or not settings.AWS_DEFAULT_REGION:
+        return None
+    return (
+        f"https://{settings.AWS_S3_PUBLIC_ASSETS}.s3."
+        f"{settings.AWS_DEFAULT_REGION}.amazonaws.com/"
+        f"{settings.DEFAULT_PROFILE_IMAGE_KEY}"
+    )
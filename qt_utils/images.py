@@ -0,0 +1,73 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .background import BackgroundExecutor
+
+IMAGE_FORMATS = {
+    # format: (PIL format, extension)
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+variant_executor = BackgroundExecutor(
+    "image-variants",
+    workers_setting="IMAGE_VARIANT_WORKERS",
+    error_message="Failed to generate image variants",
+)
+
+
+def get_variant_name(name, size, image_format):
+    # e.g. user_<email>/profile_image.png -> user_<email>/profile_image_128.webp
+    base_name = name.rsplit(".", 1)[0]
+    return f"{base_name}_{size}.{IMAGE_FORMATS[image_format][1]}"
+
+
+def generate_variants(image_file, sizes=None, formats=None):
+    """
+    Generates square variants of the image in each of the sizes and formats.
+    Yields (size, format, ContentFile) tuples.
+    """
+    sizes = sizes or settings.IMAGE_VARIANT_SIZES
+    formats = formats or IMAGE_FORMATS.keys()
+
+    with Image.open(image_file) as original:
+        # Only the first frame of animated images is used
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    for size in sorted(sizes, reverse=True):
+        image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for image_format in formats:
+            pil_format, _ = IMAGE_FORMATS[image_format]
+            image_io = BytesIO()
+            image.save(
+                image_io, format=pil_format, quality=settings.IMAGE_VARIANT_QUALITY
+            )
+            yield size, image_format, ContentFile(image_io.getvalue())
+
+
+def get_requested_variant(request):
+    """
+    Returns the (size, format) of the variant that fits the request, the
+    smallest size of at least `?image_size=` and WebP when it is accepted.
+    """
+    sizes = sorted(settings.IMAGE_VARIANT_SIZES)
+    size = settings.IMAGE_VARIANT_DEFAULT_SIZE
+    image_format = "jpeg"
+
+    if request is not None:
+        try:
+            requested_size = int(request.query_params.get("image_size", size))
+        except ValueError:
+            requested_size = size
+        size = next((s for s in sizes if s >= requested_size), sizes[-1])
+
+        requested_format = request.query_params.get("image_format")
+        if requested_format in IMAGE_FORMATS:
+            image_format = requested_format
+        elif "image/webp" in request.META.get("HTTP_ACCEPT", ""):
+            image_format = "webp"
+
+    return size, image_format
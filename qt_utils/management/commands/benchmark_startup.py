@@ -0,0 +1,51 @@
+import statistics
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...clients import get_s3_client, get_stripe
+
+SETUP_SCRIPT = """
+import time
+started_at = time.perf_counter()
+import django
+django.setup()
+import qt_auth.models, qt_billing.views
+print(time.perf_counter() - started_at)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the process startup time and the cost of the clients "
+        "that are only created on first use"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+
+    def handle(self, *args, **kwargs) -> None:
+        durations = []
+        for _ in range(kwargs["runs"]):
+            output = subprocess.check_output(
+                [sys.executable, "-c", SETUP_SCRIPT], stderr=subprocess.DEVNULL
+            )
+            durations.append(float(output.decode().strip().splitlines()[-1]))
+
+        self.stdout.write(
+            f"Startup (django.setup + imports): "
+            f"median {statistics.median(durations) * 1000:.0f}ms, "
+            f"min {min(durations) * 1000:.0f}ms over {len(durations)} run(s)."
+        )
+
+        for name, client in (("S3 client", get_s3_client), ("Stripe", get_stripe)):
+            client.reset()
+            started_at = time.perf_counter()
+            client()
+            duration = time.perf_counter() - started_at
+            self.stdout.write(
+                f"{name}: {duration * 1000:.0f}ms on first use, "
+                "no longer paid at startup."
+            )
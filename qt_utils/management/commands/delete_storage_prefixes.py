@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ...model_loaders import get_storage_deletion_model
+from ...storage import process_storage_deletion
+
+
+class Command(BaseCommand):
+    help = "Delete the S3 objects of recorded deletions that are not completed yet"
+
+    def handle(self, *args, **kwargs) -> None:
+        StorageDeletion = get_storage_deletion_model()
+
+        deletions = list(StorageDeletion.get_pending())
+        completed = sum(process_storage_deletion(deletion) for deletion in deletions)
+
+        self.stdout.write(f"Completed {completed} of {len(deletions)} deletion(s).")
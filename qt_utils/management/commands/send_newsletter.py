@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...model_loaders import get_newsletter_dispatch_model
+from ...newsletter import NewsletterSender
+
+
+class Command(BaseCommand):
+    help = "Send a newsletter to all newsletter subscribers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "template_name",
+            nargs="?",
+            help="Template without extension, e.g. `qt_utils/email/newsletter`.",
+        )
+        parser.add_argument("--subject")
+        parser.add_argument("--language", default=settings.LANGUAGE_CODE)
+        parser.add_argument(
+            "--resume",
+            type=int,
+            metavar="DISPATCH_ID",
+            help="Continue an interrupted dispatch from its last checkpoint.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.NEWSLETTER_CHUNK_SIZE
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.NEWSLETTER_SEND_CONCURRENCY
+        )
+        parser.add_argument("--rate", type=float, default=settings.NEWSLETTER_SEND_RATE)
+
+    def handle(self, *args, **kwargs) -> None:
+        NewsletterDispatch = get_newsletter_dispatch_model()
+
+        if kwargs["resume"]:
+            try:
+                dispatch = NewsletterDispatch.objects.get(pk=kwargs["resume"])
+            except NewsletterDispatch.DoesNotExist:
+                raise CommandError(f"Dispatch {kwargs['resume']} does not exist.")
+            if dispatch.status == NewsletterDispatch.STATUS_TYPE_COMPLETED:
+                raise CommandError(f"Dispatch {dispatch.pk} is already completed.")
+        else:
+            if not kwargs["template_name"] or not kwargs["subject"]:
+                raise CommandError("A template name and --subject are required.")
+            dispatch = NewsletterDispatch.objects.create(
+                template_name=kwargs["template_name"],
+                subject=kwargs["subject"],
+                language=kwargs["language"],
+            )
+            self.stdout.write(f"Created dispatch {dispatch.pk}.")
+
+        dispatch = NewsletterSender(
+            dispatch,
+            chunk_size=kwargs["chunk_size"],
+            concurrency=kwargs["concurrency"],
+            rate=kwargs["rate"],
+        ).send()
+
+        self.stdout.write(
+            f"Sent dispatch {dispatch.pk} to {dispatch.sent_count} subscriber(s), "
+            f"{dispatch.failed_count} failed."
+        )
+        if dispatch.failed_count:
+            self.stdout.write(
+                f"Retry the failed subscribers with --resume {dispatch.pk}."
+            )
@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...emails import send_outgoing_emails
+
+
+class Command(BaseCommand):
+    help = "Send the queued outgoing emails"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new emails instead of exiting once sent.",
+        )
+
+    def handle(self, *args, **kwargs) -> None:
+        while True:
+            processed = send_outgoing_emails(kwargs["batch_size"])
+            if processed:
+                continue
+            if not kwargs["loop"]:
+                break
+            time.sleep(settings.EMAIL_OUTBOX_POLL_INTERVAL)
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.1 on 2026-10-18 12:24
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("qt_utils", "0007_delete_blacklistedjwttoken_delete_device"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutgoingEmail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, editable=False
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("to", models.EmailField(max_length=254)),
+                ("from_email", models.CharField(max_length=255)),
+                ("subject", models.CharField(max_length=255)),
+                ("text_content", models.TextField()),
+                ("html_content", models.TextField(blank=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("sent", "Sent"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=16,
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+                ("last_error", models.TextField(blank=True)),
+            ],
+            options={
+                "verbose_name": "Outgoing Email",
+                "verbose_name_plural": "Outgoing Emails",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "next_attempt_at"],
+                        name="qt_utils_ou_status_1abb4f_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.1 on 2026-10-18 12:28
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("qt_utils", "0008_outgoingemail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NewsletterDispatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, editable=False
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("template_name", models.CharField(max_length=255)),
+                ("subject", models.CharField(max_length=255)),
+                ("language", models.CharField(default="en", max_length=16)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("sending", "Sending"), ("completed", "Completed")],
+                        default="sending",
+                        max_length=16,
+                    ),
+                ),
+                ("last_subscriber_id", models.PositiveBigIntegerField(default=0)),
+                ("sent_count", models.PositiveIntegerField(default=0)),
+                ("failed_count", models.PositiveIntegerField(default=0)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Newsletter Dispatch",
+                "verbose_name_plural": "Newsletter Dispatches",
+            },
+        ),
+    ]
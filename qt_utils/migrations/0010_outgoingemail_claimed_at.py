@@ -0,0 +1,31 @@
+# Generated by Django 4.2.1 on 2026-10-18 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("qt_utils", "0009_newsletterdispatch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outgoingemail",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="outgoingemail",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("sending", "Sending"),
+                    ("sent", "Sent"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=16,
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("qt_utils", "0010_outgoingemail_claimed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="newsletterdispatch",
+            name="failed_subscriber_ids",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.1 on 2026-10-18 13:25
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("qt_utils", "0011_newsletterdispatch_failed_subscriber_ids"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StorageDeletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, editable=False
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("bucket_name", models.CharField(max_length=255)),
+                ("prefix", models.CharField(max_length=1024)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Storage Deletion",
+                "verbose_name_plural": "Storage Deletions",
+            },
+        ),
+    ]
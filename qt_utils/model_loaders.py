@@ -24,6 +24,10 @@ def get_blacklisted_jwt_token_model():
     return apps.get_model("qt_security.BlacklistedJWTToken")
 
 
+def get_device_image_model():
+    return apps.get_model("qt_security.DeviceImage")
+
+
 def get_device_model():
     return apps.get_model("qt_security.Device")
 
@@ -37,6 +41,18 @@ def get_newsletter_subscriber_model():
     return apps.get_model("qt_utils.NewsletterSubscriber")
 
 
+def get_outgoing_email_model():
+    return apps.get_model("qt_utils.OutgoingEmail")
+
+
+def get_newsletter_dispatch_model():
+    return apps.get_model("qt_utils.NewsletterDispatch")
+
+
+def get_storage_deletion_model():
+    return apps.get_model("qt_utils.StorageDeletion")
+
+
 # DJ STRIPE
 def get_stripe_customer_model():
     return apps.get_model("djstripe.Customer")
@@ -1,12 +1,25 @@
+import time
 import uuid
+from datetime import timedelta
 
 from django.conf import settings
-from django.db import models
+from django.core.mail import EmailMultiAlternatives
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import ValidationError
 from storages.backends.s3boto3 import S3Boto3Storage
 
+from .cache import TieredCache
+
+presigned_url_cache = TieredCache(
+    "presigned_url",
+    max_size=settings.PRESIGNED_URL_CACHE_MAX_SIZE,
+    ttl=settings.PRESIGNED_URL_CACHE_TTL,
+    alias=settings.PRESIGNED_URL_CACHE_ALIAS,
+)
+
 
 class AbstractTimeStampModel(models.Model):
     created_at = models.DateTimeField(default=timezone.now, editable=False)
@@ -22,8 +35,43 @@ class QTPublicAssets(S3Boto3Storage):
 
 
 class QTPrivateAssets(S3Boto3Storage):
+    """
+    Private assets are served with presigned URLs. These are cached per object
+    key together with their expiry time, so clients get a stable (cacheable)
+    URL and the URL isn't signed again on every request. A cached URL is only
+    served while it's valid for at least PRESIGNED_URL_MIN_VALIDITY.
+    Saving or deleting an object drops its URL, other processes keep handing
+    out the previous URL (which serves the new object) until it's replaced.
+    """
+
     bucket_name = settings.AWS_S3_PRIVATE_ASSETS
     region_name = settings.AWS_DEFAULT_REGION
+    querystring_expire = settings.PRESIGNED_URL_EXPIRE
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if parameters or expire or http_method:
+            return super().url(name, parameters, expire, http_method)
+
+        entry = presigned_url_cache.get(name)
+        if entry is not None:
+            url, expires_at = entry
+            if expires_at - time.time() >= settings.PRESIGNED_URL_MIN_VALIDITY:
+                return url
+
+        # The expiry is taken before signing, so it's never later than the URL's
+        expires_at = time.time() + self.querystring_expire
+        url = super().url(name)
+        presigned_url_cache.set(name, (url, expires_at))
+        return url
+
+    def _save(self, name, content):
+        name = super()._save(name, content)
+        presigned_url_cache.delete(name)
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        presigned_url_cache.delete(name)
 
 
 class NewsletterSubscriber(AbstractTimeStampModel):
@@ -70,3 +118,210 @@ class NewsletterSubscriber(AbstractTimeStampModel):
     @classmethod
     def get_with_uuid(cls, uuid):
         return cls.objects.get(uuid=uuid)
+
+
+class OutgoingEmail(AbstractTimeStampModel):
+    """
+    Email that is queued to be sent by the `send_outgoing_emails` command,
+    so requests don't have to wait for (or fail on) the mail provider.
+    """
+
+    to = models.EmailField()
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    text_content = models.TextField()
+    html_content = models.TextField(blank=True)
+
+    STATUS_TYPE_PENDING = "pending"
+    STATUS_TYPE_SENDING = "sending"
+    STATUS_TYPE_SENT = "sent"
+    STATUS_TYPE_FAILED = "failed"
+
+    STATUS_TYPES = (
+        (STATUS_TYPE_PENDING, "Pending"),
+        (STATUS_TYPE_SENDING, "Sending"),
+        (STATUS_TYPE_SENT, "Sent"),
+        (STATUS_TYPE_FAILED, "Failed"),
+    )
+
+    status = models.CharField(
+        max_length=16, choices=STATUS_TYPES, default=STATUS_TYPE_PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = _("Outgoing Email")
+        verbose_name_plural = _("Outgoing Emails")
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to}"
+
+    @classmethod
+    def enqueue(cls, to, from_email, subject, text_content, html_content=""):
+        return cls.objects.create(
+            to=to,
+            from_email=from_email,
+            subject=str(subject),
+            text_content=text_content,
+            html_content=html_content,
+        )
+
+    @classmethod
+    def get_sendable(cls):
+        # Emails claimed by a worker that didn't finish (e.g. it was killed)
+        # are sent again once the claim has timed out.
+        now = timezone.now()
+        claim_timeout = timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+        return cls.objects.filter(
+            Q(status=cls.STATUS_TYPE_PENDING, next_attempt_at__lte=now)
+            | Q(status=cls.STATUS_TYPE_SENDING, claimed_at__lte=now - claim_timeout)
+        ).order_by("next_attempt_at")
+
+    @classmethod
+    def claim_sendable(cls, batch_size):
+        """
+        Marks a batch of sendable emails as sending, in a short transaction,
+        so other workers skip them while they are sent.
+        """
+        with transaction.atomic():
+            emails = list(
+                cls.get_sendable().select_for_update(skip_locked=True)[:batch_size]
+            )
+            claimed_at = timezone.now()
+            for email in emails:
+                email.status = cls.STATUS_TYPE_SENDING
+                email.claimed_at = claimed_at
+            cls.objects.bulk_update(emails, ["status", "claimed_at"])
+        return emails
+
+    def to_email_message(self, connection=None):
+        email = EmailMultiAlternatives(
+            self.subject,
+            self.text_content,
+            to=[self.to],
+            from_email=self.from_email,
+            connection=connection,
+        )
+        if self.html_content:
+            email.attach_alternative(self.html_content, "text/html")
+        return email
+
+    def mark_sent(self):
+        self.status = self.STATUS_TYPE_SENT
+        self.attempts += 1
+        self.sent_at = timezone.now()
+        self.last_error = ""
+        self.save(update_fields=["status", "attempts", "sent_at", "last_error"])
+
+    def mark_failed(self, error):
+        # Retry with an exponential backoff, until the maximum attempts are used
+        self.attempts += 1
+        self.last_error = str(error)
+        if self.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            self.status = self.STATUS_TYPE_FAILED
+        else:
+            self.status = self.STATUS_TYPE_PENDING
+            delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (self.attempts - 1)
+            self.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        self.save(update_fields=["status", "attempts", "next_attempt_at", "last_error"])
+
+
+class NewsletterDispatch(AbstractTimeStampModel):
+    """
+    A newsletter sent to all subscribers by the `send_newsletter` command.
+    Progress is checkpointed per chunk of subscribers, so an interrupted
+    dispatch can be resumed. Subscribers the newsletter failed to be sent to
+    are kept, so they can be retried, and the dispatch is only completed
+    once none are left.
+    """
+
+    template_name = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    language = models.CharField(max_length=16, default=settings.LANGUAGE_CODE)
+
+    STATUS_TYPE_SENDING = "sending"
+    STATUS_TYPE_COMPLETED = "completed"
+
+    STATUS_TYPES = (
+        (STATUS_TYPE_SENDING, "Sending"),
+        (STATUS_TYPE_COMPLETED, "Completed"),
+    )
+
+    status = models.CharField(
+        max_length=16, choices=STATUS_TYPES, default=STATUS_TYPE_SENDING
+    )
+    last_subscriber_id = models.PositiveBigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    failed_subscriber_ids = models.JSONField(default=list, blank=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = _("Newsletter Dispatch")
+        verbose_name_plural = _("Newsletter Dispatches")
+
+    def __str__(self):
+        return f"{self.subject} ({self.status})"
+
+    def checkpoint(self, sent_count, failed_subscriber_ids, last_subscriber_id=None):
+        if last_subscriber_id is not None:
+            self.last_subscriber_id = last_subscriber_id
+        self.sent_count += sent_count
+        self.failed_subscriber_ids = failed_subscriber_ids
+        self.failed_count = len(failed_subscriber_ids)
+        self.save(
+            update_fields=[
+                "last_subscriber_id",
+                "sent_count",
+                "failed_count",
+                "failed_subscriber_ids",
+                "updated_at",
+            ]
+        )
+
+    def complete(self):
+        self.status = self.STATUS_TYPE_COMPLETED
+        self.completed_at = timezone.now()
+        self.save(update_fields=["status", "completed_at", "updated_at"])
+
+
+class StorageDeletion(AbstractTimeStampModel):
+    """
+    All objects under a prefix in a bucket that have to be deleted (e.g. the
+    files of a deleted user). Recorded together with the change that requires
+    it, so the deletion isn't lost when the process stops before it's done.
+    Unfinished deletions are retried by the `delete_storage_prefixes` command.
+    """
+
+    bucket_name = models.CharField(max_length=255)
+    prefix = models.CharField(max_length=1024)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = _("Storage Deletion")
+        verbose_name_plural = _("Storage Deletions")
+
+    def __str__(self):
+        return f"{self.bucket_name}/{self.prefix}"
+
+    @classmethod
+    def get_pending(cls):
+        return cls.objects.filter(completed_at=None).order_by("pk")
+
+    def mark_completed(self):
+        self.attempts += 1
+        self.completed_at = timezone.now()
+        self.last_error = ""
+        self.save(update_fields=["attempts", "completed_at", "last_error"])
+
+    def mark_failed(self, error):
+        self.attempts += 1
+        self.last_error = str(error)
+        self.save(update_fields=["attempts", "last_error"])
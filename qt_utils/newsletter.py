@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from .emails import EmailComposer
+from .model_loaders import get_newsletter_subscriber_model
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Spaces out calls to `wait` so at most `rate` calls per second pass,
+    shared by all sending threads.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next_at = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_at = max(now, self._next_at)
+            self._next_at = wait_at + self.interval
+        if wait_at > now:
+            time.sleep(wait_at - now)
+
+
+def get_unsubscribe_link(subscriber_uuid):
+    return settings.NEWSLETTER_UNSUBSCRIBE_URL.format(
+        www_url=settings.WWW_URL, uuid=subscriber_uuid
+    )
+
+
+class NewsletterSender:
+    """
+    Sends a NewsletterDispatch to all subscribers after its checkpoint.
+
+    Subscribers are streamed in chunks ordered by id, every chunk is rendered
+    and sent by a limited number of threads (each with its own mail connection)
+    before the checkpoint moves past it. A resumed dispatch therefore sends at
+    most one chunk twice. The subscribers that failed are retried once all
+    subscribers had their turn, and again when the dispatch is resumed.
+    """
+
+    def __init__(self, dispatch, chunk_size=None, concurrency=None, rate=None):
+        self.dispatch = dispatch
+        self.chunk_size = chunk_size or settings.NEWSLETTER_CHUNK_SIZE
+        self.concurrency = concurrency or settings.NEWSLETTER_SEND_CONCURRENCY
+        if rate is None:
+            rate = settings.NEWSLETTER_SEND_RATE
+        self.rate_limiter = RateLimiter(rate)
+        self.composer = EmailComposer(dispatch.template_name, dispatch.subject)
+        self.from_email = f"QuantTrade <{settings.NO_REPLY_EMAIL_ADDRESS}>"
+        self._local = threading.local()
+        self._connections = []
+
+    def send(self):
+        NewsletterSubscriber = get_newsletter_subscriber_model()
+        subscribers = (
+            NewsletterSubscriber.objects.filter(pk__gt=self.dispatch.last_subscriber_id)
+            .order_by("pk")
+            .values_list("pk", "email", "uuid")
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="newsletter"
+        ) as executor:
+            try:
+                self._send_chunks(executor, subscribers)
+                self._retry_failed(executor)
+            finally:
+                for connection in self._connections:
+                    connection.close()
+
+        if not self.dispatch.failed_subscriber_ids:
+            self.dispatch.complete()
+        return self.dispatch
+
+    def _send_chunks(self, executor, subscribers, retry=False):
+        chunk = []
+        for subscriber in subscribers:
+            chunk.append(subscriber)
+            if len(chunk) == self.chunk_size:
+                self._send_chunk(executor, chunk, retry)
+                chunk = []
+        if chunk:
+            self._send_chunk(executor, chunk, retry)
+
+    def _retry_failed(self, executor):
+        if not self.dispatch.failed_subscriber_ids:
+            return
+
+        NewsletterSubscriber = get_newsletter_subscriber_model()
+        subscribers = list(
+            NewsletterSubscriber.objects.filter(
+                pk__in=self.dispatch.failed_subscriber_ids
+            )
+            .order_by("pk")
+            .values_list("pk", "email", "uuid")
+        )
+        # Subscribers that unsubscribed in the meantime are not retried
+        self.dispatch.checkpoint(
+            sent_count=0,
+            failed_subscriber_ids=[subscriber[0] for subscriber in subscribers],
+        )
+        self._send_chunks(executor, subscribers, retry=True)
+
+    def _send_chunk(self, executor, chunk, retry=False):
+        contexts = (
+            {
+                "www_url": settings.WWW_URL,
+                "email": email,
+                "unsubscribe_link": get_unsubscribe_link(subscriber_uuid),
+            }
+            for _, email, subscriber_uuid in chunk
+        )
+        messages = zip(
+            chunk, self.composer.render_many(contexts, self.dispatch.language)
+        )
+        results = list(executor.map(self._send_message, messages))
+
+        chunk_ids = {subscriber_id for subscriber_id, _, _ in chunk}
+        failed_ids = [
+            subscriber_id
+            for (subscriber_id, _, _), sent in zip(chunk, results)
+            if not sent
+        ]
+        # Retried subscribers are only kept when they failed again
+        previous_failed_ids = [
+            subscriber_id
+            for subscriber_id in self.dispatch.failed_subscriber_ids
+            if not retry or subscriber_id not in chunk_ids
+        ]
+        self.dispatch.checkpoint(
+            sent_count=sum(results),
+            failed_subscriber_ids=previous_failed_ids + failed_ids,
+            last_subscriber_id=None if retry else chunk[-1][0],
+        )
+
+    def _get_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = get_connection()
+            connection.open()
+            self._local.connection = connection
+            self._connections.append(connection)
+        return connection
+
+    def _send_message(self, message):
+        (_, email, subscriber_uuid), (subject, text_content, html_content) = message
+        unsubscribe_link = get_unsubscribe_link(subscriber_uuid)
+
+        email_message = EmailMultiAlternatives(
+            subject,
+            text_content,
+            to=[email],
+            from_email=self.from_email,
+            headers={"List-Unsubscribe": f"<{unsubscribe_link}>"},
+            connection=self._get_connection(),
+        )
+        email_message.attach_alternative(html_content, "text/html")
+
+        self.rate_limiter.wait()
+        try:
+            email_message.send()
+        except Exception:
+            logger.exception("Failed to send the newsletter to %s", email)
+            return False
+        return True
@@ -1,5 +1,7 @@
 from rest_framework.fields import Field
 
+from .images import get_requested_variant
+
 
 class ImageField(Field):
     def __init__(self, **kwargs):
@@ -9,3 +11,10 @@ class ImageField(Field):
 
     def to_representation(self, obj):
         return obj.get_image
+
+
+class ImageVariantField(ImageField):
+    def to_representation(self, obj):
+        # The variant that fits the size and format the client asked for
+        size, image_format = get_requested_variant(self.context.get("request"))
+        return obj.get_image_variant(size, image_format)
@@ -0,0 +1,100 @@
+import logging
+
+from .background import BackgroundExecutor
+from .clients import get_s3_client
+from .model_loaders import get_storage_deletion_model
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of keys S3 accepts in a single DeleteObjects request
+DELETE_OBJECTS_MAX_KEYS = 1000
+
+delete_executor = BackgroundExecutor(
+    "s3-delete",
+    workers_setting="S3_DELETE_WORKERS",
+    error_message="Failed to delete S3 objects",
+)
+
+
+def delete_prefix(client, bucket_name, prefix):
+    """
+    Deletes all objects under the prefix, one DeleteObjects request per
+    listed page of (at most 1000) keys.
+    Returns the number of deleted and failed objects.
+    """
+    deleted = failed = 0
+
+    paginator = client.get_paginator("list_objects_v2")
+    pages = paginator.paginate(
+        Bucket=bucket_name,
+        Prefix=prefix,
+        PaginationConfig={"PageSize": DELETE_OBJECTS_MAX_KEYS},
+    )
+    for page in pages:
+        keys = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+        if not keys:
+            continue
+
+        response = client.delete_objects(
+            Bucket=bucket_name, Delete={"Objects": keys, "Quiet": True}
+        )
+        # In quiet mode only the keys that failed are returned
+        errors = response.get("Errors", [])
+        for error in errors:
+            logger.warning(
+                "Failed to delete %s from %s: %s",
+                error.get("Key"),
+                bucket_name,
+                error.get("Message"),
+            )
+        failed += len(errors)
+        deleted += len(keys) - len(errors)
+
+    logger.info(
+        "Deleted %s object(s) under %s in %s, %s failed",
+        deleted,
+        prefix,
+        bucket_name,
+        failed,
+    )
+    return deleted, failed
+
+
+def schedule_prefix_deletion(bucket_name, prefix):
+    """
+    Records the deletion of all objects under the prefix and deletes them
+    in a background thread once the transaction is committed.
+    """
+    StorageDeletion = get_storage_deletion_model()
+    deletion = StorageDeletion.objects.create(bucket_name=bucket_name, prefix=prefix)
+    # Only delete once the transaction is committed, so a rollback keeps the files
+    delete_executor.submit_on_commit(_process_storage_deletion, deletion.pk)
+    return deletion
+
+
+def process_storage_deletion(deletion, client=None):
+    """
+    Deletes the objects of a StorageDeletion, which is only completed once
+    every object is deleted. Returns whether it's completed.
+    """
+    client = client or get_s3_client()
+    try:
+        _, failed = delete_prefix(client, deletion.bucket_name, deletion.prefix)
+    except Exception as err:
+        logger.exception("Failed to delete %s", deletion)
+        deletion.mark_failed(err)
+        return False
+
+    if failed:
+        deletion.mark_failed(f"Failed to delete {failed} object(s)")
+        return False
+
+    deletion.mark_completed()
+    return True
+
+
+def _process_storage_deletion(deletion_id):
+    StorageDeletion = get_storage_deletion_model()
+    deletion = StorageDeletion.get_pending().filter(pk=deletion_id).first()
+    if deletion is not None:
+        process_storage_deletion(deletion)
@@ -1,7 +1,11 @@
+from types import SimpleNamespace
+from unittest import mock
+
 import jwt
-import stripe
+from django.core.cache import caches
 
 from qt_security.factories import DeviceFactory, SessionFactory
+from qt_utils.clients import get_stripe
 from qt_utils.model_loaders import get_outstanding_token_model, get_user_model
 
 
@@ -13,7 +17,7 @@ def clear_stripe_customers():
     users = User.objects.filter(customer__isnull=False)
 
     for user in users:
-        stripe.Customer.delete(user.customer.id)
+        get_stripe().Customer.delete(user.customer.id)
 
 
 def generate_jwt_token(token_type, user_id, exp_time, secret_key):
@@ -46,3 +50,32 @@ def get_refresh_token_for_user(user):
     SessionFactory(device=device, token=outstanding_token)
 
     return token["refresh"]
+
+
+class StripeSessionTestMixin:
+    """
+    Patches `get_stripe` of `stripe_module` and clears the default cache
+    around every test, for tests of cached Stripe sessions
+    """
+
+    stripe_module = None
+
+    def setUp(self):
+        super().setUp()
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        stripe_patcher = mock.patch(f"{self.stripe_module}.get_stripe")
+        self.stripe = stripe_patcher.start()()
+        self.addCleanup(stripe_patcher.stop)
+
+    def mock_session_create(self, create, prefix, url, **attributes):
+        """
+        Makes `create` return sessions numbered by call, the `attributes` are
+        computed from the keyword arguments of the call
+        """
+        create.side_effect = lambda **kwargs: SimpleNamespace(
+            id=f"{prefix}_{create.call_count}",
+            url=f"{url}{prefix}_{create.call_count}",
+            **{name: attribute(kwargs) for name, attribute in attributes.items()},
+        )
+        return create
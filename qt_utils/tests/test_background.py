@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase, override_settings
+
+from qt_utils.background import BackgroundExecutor
+
+
+def fail(reason):
+    raise ValueError(reason)
+
+
+@override_settings(TEST_BACKGROUND_WORKERS=1)
+class BackgroundExecutorTests(SimpleTestCase):
+    """
+    Test running work in the background thread pool
+    """
+
+    def test_submit_returns_result(self):
+        """
+        Should run the function in a worker thread
+        """
+        executor = BackgroundExecutor(
+            "test", workers_setting="TEST_BACKGROUND_WORKERS", error_message="Failed"
+        )
+
+        self.assertEqual(executor.submit(sum, [1, 2]).result(), 3)
+
+    def test_failure_is_logged_with_message(self):
+        """
+        Should log failures with the given message
+        """
+        executor = BackgroundExecutor(
+            "test",
+            workers_setting="TEST_BACKGROUND_WORKERS",
+            error_message="Failed to do the test work",
+        )
+
+        with self.assertLogs("qt_utils.background", level="ERROR") as logs:
+            future = executor.submit(fail, "broken")
+            with self.assertRaises(ValueError):
+                future.result()
+
+        self.assertIn("Failed to do the test work ('broken',)", logs.output[0])
@@ -0,0 +1,96 @@
+from django.test import SimpleTestCase, override_settings
+
+from qt_utils.cache import LRUCache, TieredCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class LRUCacheTests(SimpleTestCase):
+    """
+    Test the in-process LRU cache
+    """
+
+    def test_entries_expire_after_ttl(self):
+        """
+        Should miss once the TTL has passed
+        """
+        timer = FakeTimer()
+        cache = LRUCache(max_size=10, ttl=60, timer=timer)
+        cache.set("key", "value")
+
+        timer.now = 59
+        self.assertEqual(cache.get("key"), "value")
+
+        timer.now = 60
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "size": 0})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        Should evict the least recently used entry once full
+        """
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class TieredCacheTests(SimpleTestCase):
+    """
+    Test the in-process cache backed by a shared Django cache
+    """
+
+    def test_shared_tier_is_used_on_local_miss(self):
+        """
+        Should fall back to the shared cache and promote the entry
+        """
+        cache = TieredCache("test", max_size=10, ttl=60, alias="default")
+        cache.set("key", "value")
+        cache.local.clear()
+
+        self.assertEqual(cache.get("key"), "value")
+        self.assertEqual(cache.get("key"), "value")
+        self.assertEqual(cache.stats()["shared_hits"], 1)
+        self.assertEqual(cache.stats()["local_hits"], 1)
+
+    def test_promoted_entry_keeps_shared_expiry(self):
+        """
+        Should not keep a promoted entry longer than the shared entry is valid
+        """
+        clock = FakeTimer()
+        cache = TieredCache("test", max_size=10, ttl=60, alias="default", clock=clock)
+        cache.set("key", "value")
+        cache.local.clear()
+
+        clock.now = 50
+        cache.local.timer = clock
+        self.assertEqual(cache.get("key"), "value")
+
+        clock.now = 60
+        self.assertIsNone(cache.local.get("key"))
+        self.assertIsNone(cache.get("key"))
+
+    def test_without_shared_tier(self):
+        """
+        Should only use the in-process cache
+        """
+        cache = TieredCache("test", max_size=10, ttl=60)
+        cache.set("key", "value")
+        cache.local.clear()
+
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.stats()["misses"], 1)
@@ -0,0 +1,84 @@
+from django.test import SimpleTestCase, override_settings
+
+from qt_utils.checks import check_default_profile_image, check_shared_cache_aliases
+
+
+class SharedCacheAliasCheckTests(SimpleTestCase):
+    """
+    Test the system check of caches that must be shared between processes
+    """
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        SUBSCRIPTION_CACHE_ALIAS="default",
+    )
+    def test_process_local_cache(self):
+        """
+        Should fail on a cache that is kept per process
+        """
+        errors = check_shared_cache_aliases(None)
+
+        self.assertEqual([error.id for error in errors], ["qt.E002"])
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "shared": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379",
+            },
+        },
+        SUBSCRIPTION_CACHE_ALIAS="shared",
+    )
+    def test_shared_cache(self):
+        """
+        Should accept a cache that is shared between processes
+        """
+        self.assertEqual(check_shared_cache_aliases(None), [])
+
+    @override_settings(SUBSCRIPTION_CACHE_ALIAS="unknown")
+    def test_unknown_cache(self):
+        """
+        Should fail on a cache that isn't configured
+        """
+        errors = check_shared_cache_aliases(None)
+
+        self.assertEqual([error.id for error in errors], ["qt.E001"])
+
+
+class DefaultProfileImageCheckTests(SimpleTestCase):
+    """
+    Test the system check of the default profile image
+    """
+
+    @override_settings(DEFAULT_PROFILE_IMAGE_URL=None, AWS_S3_PUBLIC_ASSETS="")
+    def test_without_public_assets(self):
+        """
+        Should warn when there is no default image
+        """
+        errors = check_default_profile_image(None)
+
+        self.assertEqual([error.id for error in errors], ["qt.W001"])
+
+    @override_settings(
+        DEFAULT_PROFILE_IMAGE_URL=None,
+        AWS_S3_PUBLIC_ASSETS="public",
+        AWS_DEFAULT_REGION="eu-central-1",
+    )
+    def test_with_public_assets(self):
+        """
+        Should accept the default image of the public assets bucket
+        """
+        self.assertEqual(check_default_profile_image(None), [])
+
+    @override_settings(
+        DEFAULT_PROFILE_IMAGE_URL="https://assets.test/unkown_user.png",
+        AWS_S3_PUBLIC_ASSETS="",
+    )
+    def test_with_url(self):
+        """
+        Should accept a default image URL
+        """
+        self.assertEqual(check_default_profile_image(None), [])
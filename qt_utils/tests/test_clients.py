@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase
+
+from qt_utils.clients import LazyClient
+
+
+class LazyClientTests(SimpleTestCase):
+    """
+    Test creating clients on first use
+    """
+
+    def test_client_is_created_once(self):
+        """
+        Should only call the factory on first use
+        """
+        calls = []
+        client = LazyClient(lambda: calls.append(1) or object())
+
+        self.assertFalse(client.is_created)
+        self.assertIs(client(), client())
+        self.assertEqual(len(calls), 1)
+
+    def test_reset(self):
+        """
+        Should create a new client after a reset
+        """
+        client = LazyClient(object)
+        first = client()
+        client.reset()
+
+        self.assertIsNot(client(), first)
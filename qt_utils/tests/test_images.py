@@ -0,0 +1,54 @@
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIRequestFactory
+
+from qt_utils.images import generate_variants, get_requested_variant, get_variant_name
+
+
+@override_settings(IMAGE_VARIANT_SIZES=[64, 128, 512], IMAGE_VARIANT_DEFAULT_SIZE=128)
+class ImageVariantTests(SimpleTestCase):
+    """
+    Test generating and selecting image variants
+    """
+
+    def test_generate_variants(self):
+        """
+        Should generate a square image in each size and format
+        """
+        image_io = BytesIO()
+        Image.new("RGBA", (800, 600)).save(image_io, format="PNG")
+        image_io.seek(0)
+
+        variants = list(generate_variants(image_io))
+
+        self.assertEqual(len(variants), 6)
+        for size, image_format, content in variants:
+            with Image.open(content) as image:
+                self.assertEqual(image.size, (size, size))
+                self.assertEqual(image.format, image_format.upper())
+
+    def test_variant_name(self):
+        self.assertEqual(
+            get_variant_name("user_a@example.com/profile_image.png", 64, "webp"),
+            "user_a@example.com/profile_image_64.webp",
+        )
+
+    def test_requested_variant(self):
+        """
+        Should return the smallest size that fits, in WebP when accepted
+        """
+        factory = APIRequestFactory()
+
+        def get_variant(*args, **kwargs):
+            request = factory.get(*args, **kwargs)
+            request.query_params = request.GET
+            return get_requested_variant(request)
+
+        self.assertEqual(get_requested_variant(None), (128, "jpeg"))
+        self.assertEqual(get_variant("/", {"image_size": 100}), (128, "jpeg"))
+        self.assertEqual(get_variant("/", {"image_size": 2000}), (512, "jpeg"))
+        self.assertEqual(get_variant("/", {"image_size": "x"}), (128, "jpeg"))
+        self.assertEqual(get_variant("/", HTTP_ACCEPT="image/webp,*/*"), (128, "webp"))
+        self.assertEqual(get_variant("/", {"image_format": "webp"}), (128, "webp"))
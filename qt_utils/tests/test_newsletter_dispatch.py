@@ -0,0 +1,153 @@
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from qt_utils.factories import NewsletterSubscriberFactory
+from qt_utils.models import NewsletterDispatch
+from qt_utils.newsletter import get_unsubscribe_link
+
+
+class FlakyEmailBackend(BaseEmailBackend):
+    # Fails once for every recipient in `failing`, like a transient SES error
+    failing = set()
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            if message.to[0] in self.failing:
+                self.failing.discard(message.to[0])
+                raise ConnectionError("Throttled")
+            mail.outbox.append(message)
+        return len(email_messages)
+
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {
+            "loaders": [
+                (
+                    "django.template.loaders.locmem.Loader",
+                    {
+                        "newsletter.txt": "Unsubscribe: {{ unsubscribe_link }}",
+                        "newsletter.html": "<a href='{{ unsubscribe_link }}'>x</a>",
+                    },
+                )
+            ]
+        },
+    }
+]
+
+
+@override_settings(
+    TEMPLATES=TEMPLATES,
+    NEWSLETTER_UNSUBSCRIBE_URL="https://quanttrade.test/unsubscribe/{uuid}",
+)
+class NewsletterDispatchTests(TestCase):
+    """
+    Test sending a newsletter with the `send_newsletter` command
+    """
+
+    def setUp(self):
+        self.subscribers = [
+            NewsletterSubscriberFactory(email=f"subscriber{i}@example.com")
+            for i in range(5)
+        ]
+
+    def send_newsletter(self, *args):
+        call_command("send_newsletter", *args, chunk_size=2, rate=0, stdout=StringIO())
+
+    def test_send_newsletter(self):
+        """
+        Should send every subscriber its own unsubscribe link
+        """
+        self.send_newsletter("newsletter", "--subject", "News")
+
+        self.assertEqual(len(mail.outbox), 5)
+        for subscriber in self.subscribers:
+            message = next(m for m in mail.outbox if m.to == [subscriber.email])
+            link = f"https://quanttrade.test/unsubscribe/{subscriber.uuid}"
+            self.assertIn(link, message.body)
+            self.assertEqual(message.extra_headers["List-Unsubscribe"], f"<{link}>")
+
+        dispatch = NewsletterDispatch.objects.get()
+        self.assertEqual(dispatch.status, NewsletterDispatch.STATUS_TYPE_COMPLETED)
+        self.assertEqual(dispatch.sent_count, 5)
+        self.assertEqual(dispatch.last_subscriber_id, self.subscribers[-1].pk)
+
+    def test_resume_newsletter(self):
+        """
+        Should only send to the subscribers after the checkpoint
+        """
+        dispatch = NewsletterDispatch.objects.create(
+            template_name="newsletter",
+            subject="News",
+            last_subscriber_id=self.subscribers[2].pk,
+            sent_count=3,
+        )
+
+        self.send_newsletter("--resume", str(dispatch.pk))
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [self.subscribers[3].email, self.subscribers[4].email],
+        )
+        dispatch.refresh_from_db()
+        self.assertEqual(dispatch.sent_count, 5)
+        self.assertEqual(dispatch.status, NewsletterDispatch.STATUS_TYPE_COMPLETED)
+
+    @override_settings(
+        EMAIL_BACKEND="qt_utils.tests.test_newsletter_dispatch.FlakyEmailBackend"
+    )
+    def test_failed_subscribers_are_retried(self):
+        """
+        Should retry the subscribers that failed after the other subscribers
+        """
+        FlakyEmailBackend.failing = {self.subscribers[1].email}
+
+        with self.assertLogs("qt_utils.newsletter", level="ERROR"):
+            self.send_newsletter("newsletter", "--subject", "News")
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(subscriber.email for subscriber in self.subscribers),
+        )
+        dispatch = NewsletterDispatch.objects.get()
+        self.assertEqual(dispatch.status, NewsletterDispatch.STATUS_TYPE_COMPLETED)
+        self.assertEqual(dispatch.sent_count, 5)
+        self.assertEqual(dispatch.failed_subscriber_ids, [])
+
+    def test_resume_retries_failed_subscribers(self):
+        """
+        Should keep a dispatch with failed subscribers open and retry them
+        """
+        dispatch = NewsletterDispatch.objects.create(
+            template_name="newsletter",
+            subject="News",
+            last_subscriber_id=self.subscribers[-1].pk,
+            sent_count=4,
+            failed_count=1,
+            failed_subscriber_ids=[self.subscribers[0].pk],
+        )
+
+        self.send_newsletter("--resume", str(dispatch.pk))
+
+        self.assertEqual([m.to[0] for m in mail.outbox], [self.subscribers[0].email])
+        dispatch.refresh_from_db()
+        self.assertEqual(dispatch.sent_count, 5)
+        self.assertEqual(dispatch.failed_count, 0)
+        self.assertEqual(dispatch.status, NewsletterDispatch.STATUS_TYPE_COMPLETED)
+
+    @override_settings(
+        NEWSLETTER_UNSUBSCRIBE_URL="{www_url}/unsubscribe/{uuid}",
+        WWW_URL="https://quanttrade.test",
+    )
+    def test_unsubscribe_link_uses_www_url(self):
+        """
+        Should build the unsubscribe link from the current WWW_URL
+        """
+        self.assertEqual(
+            get_unsubscribe_link("uuid"), "https://quanttrade.test/unsubscribe/uuid"
+        )
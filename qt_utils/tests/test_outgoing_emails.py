@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from qt_utils.models import OutgoingEmail
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("Mail provider unavailable")
+
+
+class CrashingEmailBackend(BaseEmailBackend):
+    # Sends the first email and then dies, like a worker killed mid-batch
+    def send_messages(self, email_messages):
+        if mail.outbox:
+            raise SystemExit("Worker killed")
+        mail.outbox.extend(email_messages)
+        return len(email_messages)
+
+
+class OutgoingEmailTests(TestCase):
+    """
+    Test sending queued emails with the `send_outgoing_emails` command
+    """
+
+    def setUp(self):
+        self.email = OutgoingEmail.enqueue(
+            to="user@example.com",
+            from_email="QuantTrade <no-reply@example.com>",
+            subject="Subject",
+            text_content="Text",
+            html_content="<p>Html</p>",
+        )
+
+    def test_send_outgoing_emails(self):
+        """
+        Should send the queued email and mark it as sent
+        """
+        call_command("send_outgoing_emails")
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@example.com"])
+        self.assertEqual(mail.outbox[0].alternatives, [("<p>Html</p>", "text/html")])
+
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, OutgoingEmail.STATUS_TYPE_SENT)
+        self.assertEqual(self.email.attempts, 1)
+        self.assertIsNotNone(self.email.sent_at)
+
+    def test_send_outgoing_emails_only_once(self):
+        """
+        Should not send an email that was already sent
+        """
+        call_command("send_outgoing_emails")
+        call_command("send_outgoing_emails")
+
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(
+        EMAIL_BACKEND="qt_utils.tests.test_outgoing_emails.FailingEmailBackend",
+        EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    )
+    def test_send_outgoing_emails_failure(self):
+        """
+        Should retry a failed email later and give up after the maximum attempts
+        """
+        call_command("send_outgoing_emails")
+
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, OutgoingEmail.STATUS_TYPE_PENDING)
+        self.assertEqual(self.email.attempts, 1)
+        self.assertGreater(self.email.next_attempt_at, timezone.now())
+        self.assertIn("Mail provider unavailable", self.email.last_error)
+
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        call_command("send_outgoing_emails")
+
+        self.email.refresh_from_db()
+        self.assertEqual(self.email.status, OutgoingEmail.STATUS_TYPE_FAILED)
+        self.assertEqual(self.email.attempts, 2)
+
+    @override_settings(
+        EMAIL_BACKEND="qt_utils.tests.test_outgoing_emails.CrashingEmailBackend"
+    )
+    def test_sent_emails_are_kept_when_interrupted(self):
+        """
+        Should keep the emails sent before the worker was interrupted as sent
+        """
+        second_email = OutgoingEmail.enqueue(
+            to="other@example.com",
+            from_email="QuantTrade <no-reply@example.com>",
+            subject="Subject",
+            text_content="Text",
+        )
+
+        with self.assertRaises(SystemExit):
+            call_command("send_outgoing_emails")
+
+        self.email.refresh_from_db()
+        second_email.refresh_from_db()
+        self.assertEqual(self.email.status, OutgoingEmail.STATUS_TYPE_SENT)
+        self.assertEqual(second_email.status, OutgoingEmail.STATUS_TYPE_SENDING)
+
+    @override_settings(EMAIL_OUTBOX_CLAIM_TIMEOUT=60)
+    def test_claimed_emails_are_skipped_until_timed_out(self):
+        """
+        Should skip emails claimed by another worker, unless the claim timed out
+        """
+        OutgoingEmail.claim_sendable(batch_size=10)
+
+        call_command("send_outgoing_emails")
+        self.assertEqual(len(mail.outbox), 0)
+
+        OutgoingEmail.objects.update(claimed_at=timezone.now() - timedelta(seconds=61))
+        call_command("send_outgoing_emails")
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,74 @@
+from itertools import count
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from qt_utils.models import QTPrivateAssets, presigned_url_cache
+
+
+class PresignedURLCacheTests(SimpleTestCase):
+    """
+    Test reusing presigned URLs of private assets
+    """
+
+    def setUp(self):
+        presigned_url_cache.clear()
+        signatures = count()
+        self.sign_patcher = mock.patch.object(
+            S3Boto3Storage,
+            "url",
+            side_effect=lambda name, *args: f"https://s3/{name}?sig={next(signatures)}",
+        )
+        self.sign = self.sign_patcher.start()
+        self.storage = QTPrivateAssets()
+
+    def tearDown(self):
+        self.sign_patcher.stop()
+        presigned_url_cache.clear()
+
+    def test_url_is_reused(self):
+        """
+        Should only sign the URL once
+        """
+        url = self.storage.url("user_a/profile_image.png")
+
+        self.assertEqual(self.storage.url("user_a/profile_image.png"), url)
+        self.assertEqual(self.sign.call_count, 1)
+
+    def test_url_with_parameters_is_not_cached(self):
+        """
+        Should sign URLs with custom parameters every time
+        """
+        self.storage.url("user_a/profile_image.png", expire=10)
+        self.storage.url("user_a/profile_image.png", expire=10)
+
+        self.assertEqual(self.sign.call_count, 2)
+
+    def test_url_changes_after_save(self):
+        """
+        Should sign a new URL once the object is overwritten
+        """
+        url = self.storage.url("user_a/profile_image.png")
+
+        with mock.patch.object(
+            S3Boto3Storage, "_save", return_value="user_a/profile_image.png"
+        ):
+            self.storage.save("user_a/profile_image.png", ContentFile(b"image"))
+
+        self.assertNotEqual(self.storage.url("user_a/profile_image.png"), url)
+
+    @override_settings(PRESIGNED_URL_MIN_VALIDITY=60 * 30)
+    def test_url_close_to_expiry_is_signed_again(self):
+        """
+        Should not serve a cached URL that is about to expire
+        """
+        with mock.patch("qt_utils.models.time.time", return_value=1000):
+            url = self.storage.url("user_a/profile_image.png")
+
+        # Signed at 1000 and valid for an hour, so less than 30 minutes are left
+        with mock.patch("qt_utils.models.time.time", return_value=1000 + 60 * 31):
+            self.assertNotEqual(self.storage.url("user_a/profile_image.png"), url)
+
+        self.assertEqual(self.sign.call_count, 2)
@@ -0,0 +1,120 @@
+from io import StringIO
+from unittest import mock
+
+import boto3
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from moto import mock_s3
+
+from qt_utils.models import StorageDeletion
+from qt_utils.storage import delete_prefix, schedule_prefix_deletion
+
+
+class S3TestMixin:
+    bucket_name = "qt-test-bucket"
+
+    def setUp(self):
+        self.mocked_s3 = mock_s3()
+        self.mocked_s3.start()
+        self.client = boto3.client("s3", region_name=settings.AWS_DEFAULT_REGION)
+        self.client.create_bucket(
+            Bucket=self.bucket_name,
+            CreateBucketConfiguration={
+                "LocationConstraint": settings.AWS_DEFAULT_REGION
+            },
+        )
+
+    def tearDown(self):
+        self.mocked_s3.stop()
+
+
+class DeletePrefixTests(S3TestMixin, SimpleTestCase):
+    """
+    Test deleting all S3 objects under a prefix
+    """
+
+    def test_delete_prefix(self):
+        """
+        Should delete every object under the prefix in batches
+        """
+        for i in range(1001):
+            self.client.put_object(
+                Bucket=self.bucket_name, Key=f"user_a@example.com/{i}", Body=b""
+            )
+        self.client.put_object(
+            Bucket=self.bucket_name, Key="user_b@example.com/0", Body=b""
+        )
+
+        deleted, failed = delete_prefix(
+            self.client, self.bucket_name, "user_a@example.com/"
+        )
+
+        self.assertEqual((deleted, failed), (1001, 0))
+        remaining = self.client.list_objects_v2(Bucket=self.bucket_name)["Contents"]
+        self.assertEqual([obj["Key"] for obj in remaining], ["user_b@example.com/0"])
+
+    def test_delete_empty_prefix(self):
+        """
+        Should not delete anything
+        """
+        self.assertEqual(
+            delete_prefix(self.client, self.bucket_name, "user_a@example.com/"),
+            (0, 0),
+        )
+
+
+class StorageDeletionTests(S3TestMixin, TestCase):
+    """
+    Test recording deletions and completing them with `delete_storage_prefixes`
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.put_object(
+            Bucket=self.bucket_name, Key="user_a@example.com/0", Body=b""
+        )
+
+    def test_deletion_is_recorded_before_commit(self):
+        """
+        Should record the deletion and only delete once committed
+        """
+        with self.captureOnCommitCallbacks() as callbacks:
+            deletion = schedule_prefix_deletion(self.bucket_name, "user_a@example.com/")
+
+        self.assertEqual(list(StorageDeletion.get_pending()), [deletion])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_command_completes_pending_deletions(self):
+        """
+        Should delete the objects of deletions the background thread didn't do
+        """
+        deletion = StorageDeletion.objects.create(
+            bucket_name=self.bucket_name, prefix="user_a@example.com/"
+        )
+
+        with mock.patch("qt_utils.storage.get_s3_client", return_value=self.client):
+            call_command("delete_storage_prefixes", stdout=StringIO())
+
+        deletion.refresh_from_db()
+        self.assertIsNotNone(deletion.completed_at)
+        self.assertNotIn(
+            "Contents", self.client.list_objects_v2(Bucket=self.bucket_name)
+        )
+
+    def test_failed_deletion_stays_pending(self):
+        """
+        Should keep a deletion that failed pending, with its error
+        """
+        deletion = StorageDeletion.objects.create(
+            bucket_name="missing-bucket", prefix="user_a@example.com/"
+        )
+
+        with mock.patch("qt_utils.storage.get_s3_client", return_value=self.client):
+            with self.assertLogs("qt_utils.storage", level="ERROR"):
+                call_command("delete_storage_prefixes", stdout=StringIO())
+
+        deletion.refresh_from_db()
+        self.assertIsNone(deletion.completed_at)
+        self.assertEqual(deletion.attempts, 1)
+        self.assertIn("NoSuchBucket", deletion.last_error)